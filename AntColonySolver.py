@@ -0,0 +1,104 @@
+from BaseSolver import BaseSolver
+from GreedySolver import nearestNeighborTours
+import math
+import numpy
+
+
+class AntColonySolver(BaseSolver):
+    ANT_COUNT = 32
+
+    # Weight of pheromone and of visibility in the transition rule
+    ALPHA = 1.0
+    BETA = 3.0
+
+    # Share of pheromone lost per iteration
+    EVAPORATION = 0.1
+
+    # Extra deposits on the best tour so far, in ants
+    ELITIST_WEIGHT = 1.0
+
+    def __init__(self, tspSolver, maxTime, antCount=ANT_COUNT):
+        super().__init__(tspSolver, maxTime)
+        self.antCount = antCount
+        self.random = numpy.random.default_rng()
+
+    # Elitist ant system. Pheromone (tau) and visibility (eta = 1 / (cost + 1),
+    # zero on INF edges) are N x N arrays. Each iteration raises them to
+    # ALPHA / BETA once, then all ants move together: a step gathers the
+    # weight rows of every ant's current city, zeroes visited cities and
+    # picks by roulette on the row-wise cumulative sums. Ants stranded with
+    # no usable edge finish on arbitrary cities and are dropped. Every
+    # valid ant deposits 1 / cost on its edges after evaporation.
+    # count is the number of iterations and total the number of ants built.
+    # Time complexity: O(A * N^2) per iteration
+    # Space complexity: O(N^2 + A * N)
+    def run(self):
+        costs = self.getCostMatrix()
+        cityCount = self.getCityCount()
+
+        # One nearest-neighbor tour sets the BSSF and the pheromone scale
+        tours, tourCosts = nearestNeighborTours(costs, [self.random.integers(cityCount)])
+        if tourCosts[0] < math.inf:
+            self.setBSSFFromIndices(tours[0])
+            scale = tourCosts[0]
+        else:
+            scale = costs[numpy.isfinite(costs)].mean() * cityCount
+
+        visibility = numpy.where(numpy.isfinite(costs), 1.0 / (costs + 1.0), 0.0)
+        visibility = visibility ** self.BETA
+        pheromone = numpy.full((cityCount, cityCount), self.antCount / scale)
+
+        while not self.exceededMaxTime():
+            tours = self.buildTours(pheromone ** self.ALPHA * visibility)
+            tourCosts = costs[tours, numpy.roll(tours, -1, axis=1)].sum(axis=1)
+            self.incrementSolutionCount()
+            self.incrementTotal(len(tours))
+
+            best = tourCosts.argmin()
+            if tourCosts[best] < self.getBSSFCost():
+                self.setBSSFFromIndices(tours[best])
+
+            pheromone *= 1.0 - self.EVAPORATION
+            valid = tourCosts < math.inf
+            self.deposit(pheromone, tours[valid], 1.0 / tourCosts[valid])
+            if self.getBSSF() is not None and self.getBSSFCost() < math.inf:
+                self.deposit(pheromone, self.getBSSF().getIndices()[numpy.newaxis, :],
+                             numpy.array([self.ELITIST_WEIGHT / self.getBSSFCost()]))
+
+    # Time complexity: O(A * N^2)
+    # Space complexity: O(A * N)
+    def buildTours(self, weights):
+        cityCount = self.getCityCount()
+        rows = numpy.arange(self.antCount)
+
+        tours = numpy.empty((self.antCount, cityCount), dtype=numpy.int32)
+        current = self.random.integers(cityCount, size=self.antCount)
+        tours[:, 0] = current
+        visited = numpy.zeros((self.antCount, cityCount), dtype=bool)
+        visited[rows, current] = True
+
+        for step in range(1, cityCount):
+            stepWeights = weights[current]
+            stepWeights[visited] = 0.0
+            cumulative = stepWeights.cumsum(axis=1)
+            totals = cumulative[:, -1]
+
+            # First city whose cumulative weight passes the draw has weight > 0
+            draws = self.random.random(self.antCount) * totals
+            target = (cumulative > draws[:, numpy.newaxis]).argmax(axis=1)
+            stranded = totals <= 0.0
+            target[stranded] = visited[stranded].argmin(axis=1)
+
+            visited[rows, target] = True
+            tours[:, step] = target
+            current = target
+        return tours
+
+    # Adds amount to every edge of each tour, repeated edges included
+    # Time complexity: O(A * N)
+    # Space complexity: O(A * N)
+    @staticmethod
+    def deposit(pheromone, tours, amounts):
+        nextCities = numpy.roll(tours, -1, axis=1)
+        numpy.add.at(pheromone, (tours, nextCities),
+                     numpy.broadcast_to(amounts[:, numpy.newaxis], tours.shape))
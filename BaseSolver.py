@@ -1,6 +1,7 @@
 from TSPClasses import City
 from TSPClasses import Scenario
 from TSPClasses import TSPSolution
+from SolverInstrumentation import NullInstrumentation
 from typing import List
 from abc import abstractmethod
 import time
@@ -22,13 +23,22 @@ class BaseSolver:
         self._intermediateCount = 0
         self._total = 0
         self._pruned = 0
+        self._instrumentation = getattr(tspSolver, '_instrumentation', None) or NullInstrumentation()
 
         self.setBSSF(None)
         self.setMaxConcurrentNodes(None)
 
     def solve(self):
         self._startTime = time.time()
-        self.run()
+        self._instrumentation.begin()
+        # A failing run must still stop the profilers and leave the
+        # instrumentation depth balanced for later runs
+        try:
+            self.run()
+        finally:
+            completed = self._instrumentation.end()
+        if completed:
+            self._results['instrumentation'] = self._instrumentation.getResults()
 
         bssf = self.getBSSF()
         self._results['cost'] = bssf.cost if bssf is not None else math.inf
@@ -52,6 +62,9 @@ class BaseSolver:
     def getResults(self):
         return self._results
 
+    def getInstrumentation(self):
+        return self._instrumentation
+
     def getTSPSolver(self):
         return self._tspSolver
 
@@ -70,17 +83,28 @@ class BaseSolver:
     def getCityRange(self):
         return range(self.getCityCount())
 
+    def getCostMatrix(self):
+        return self.getScenario().getCostMatrix()
+
     def setBSSFFromRoute(self, route):
         self.setBSSF(TSPSolution(route))
 
+    def setBSSFFromIndices(self, indices):
+        self.setBSSF(TSPSolution.fromIndices(self.getScenario(), indices))
+
     def getBSSFCost(self) -> float:
         return math.inf if self.getBSSF() is None else self.getBSSF().cost
 
     def getBSSF(self) -> TSPSolution:
         return self._bssf
 
+    # Improvements are published to the TSPSolver's BSSF listeners
     def setBSSF(self, value):
+        improved = value is not None and value.cost < self.getBSSFCost()
         self._bssf = value
+        self._instrumentation.recordBSSF(value)
+        if improved:
+            self._tspSolver.publishBSSF(value)
 
     def getMaxConcurrentNodes(self):
         return self._max
@@ -103,8 +127,9 @@ class BaseSolver:
     def getClampedTime(self):
         return min(self.getMaxTime(), self.getTotalTime())
 
+    # Also True once the run was cancelled through the TSPSolver
     def exceededMaxTime(self):
-        return self.getTotalTime() > self.getMaxTime()
+        return self.getTotalTime() > self.getMaxTime() or self._tspSolver.isCancelled()
 
     def tryUpdateMaxConcurrentNodes(self, new_value):
         updated_val = max(self.getMaxConcurrentNodes(), new_value)
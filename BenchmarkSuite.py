@@ -0,0 +1,298 @@
+#!/usr/bin/python3
+
+# Reproducible benchmarks for the hot kernels and solvers, with baselines:
+#   python3 BenchmarkSuite.py --save baseline.json
+#   python3 BenchmarkSuite.py --compare baseline.json      (exit 1 on regression)
+# Every case is (benchmark, difficulty, size, seed) on a scenario built like
+# Proj5GUI's. Python and numpy RNGs are reseeded before every run. Plain Hard
+# is left out by default because its edge thinning is not seeded.
+from BranchNode import BranchNode
+from HeadlessRunner import generateScenario
+from ReducedCostMatrix import ReducedCostMatrix
+from TSPSolver import TSPSolver
+from abc import abstractmethod
+import argparse
+import contextlib
+import json
+import numpy
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+
+# One measured operation. setup() runs untimed before every repetition and
+# run() returns how many units of work it did.
+class Benchmark:
+    name = None
+    unit = None
+
+    def setup(self, scenario, timeLimit):
+        return scenario
+
+    @abstractmethod
+    def run(self, state) -> int:
+        pass
+
+
+class CostToBenchmark(Benchmark):
+    name = 'costTo'
+    unit = 'calls'
+
+    def setup(self, scenario, timeLimit):
+        return scenario.getCities()
+
+    def run(self, cities) -> int:
+        for source in cities:
+            for destination in cities:
+                source.costTo(destination)
+        return len(cities) ** 2
+
+
+class CostMatrixBenchmark(Benchmark):
+    name = 'costMatrix'
+    unit = 'entries'
+
+    def run(self, scenario) -> int:
+        scenario._computeCostMatrix()
+        return scenario.getCityCount() ** 2
+
+
+# Construction takes about a microsecond, so one run builds a batch
+class MatrixConstructionBenchmark(Benchmark):
+    name = 'rcmConstruction'
+    unit = 'matrices'
+
+    BATCH = 100
+
+    def setup(self, scenario, timeLimit):
+        scenario.getCostMatrix()
+        return scenario
+
+    def run(self, scenario) -> int:
+        for _ in range(self.BATCH):
+            ReducedCostMatrix(scenario)
+        return self.BATCH
+
+
+class ReduceBenchmark(Benchmark):
+    name = 'rcmReduce'
+    unit = 'reductions'
+
+    def setup(self, scenario, timeLimit):
+        return ReducedCostMatrix(scenario)
+
+    def run(self, matrix) -> int:
+        matrix.reduce()
+        return 1
+
+
+# Selects the edges out of city 0, each on its own copy of the reduced root
+class SelectBenchmark(Benchmark):
+    name = 'rcmSelect'
+    unit = 'selects'
+
+    MAX_SELECTS = 32
+
+    def setup(self, scenario, timeLimit):
+        matrix = ReducedCostMatrix(scenario)
+        matrix.reduce()
+        columns = [column for column in range(1, matrix.get_col_count())
+                   if matrix.get_value_at(0, column) < numpy.inf][:self.MAX_SELECTS]
+        return [(matrix.copy(), column) for column in columns]
+
+    def run(self, selections) -> int:
+        for matrix, column in selections:
+            matrix.select(0, column)
+        return len(selections)
+
+
+class ChildNodesBenchmark(Benchmark):
+    name = 'generateChildNodes'
+    unit = 'nodes'
+
+    def setup(self, scenario, timeLimit):
+        matrix = ReducedCostMatrix(scenario)
+        matrix.reduce()
+        return scenario, BranchNode(numpy.array([0], dtype=numpy.int32), matrix)
+
+    def run(self, state) -> int:
+        scenario, rootNode = state
+        return len(rootNode.generate_child_nodes(scenario))
+
+
+# Runs a TSPSolver entry point; workField names the results field counting
+# the work done, None counts whole solves
+class SolverBenchmark(Benchmark):
+    method = None
+    workField = None
+
+    def setup(self, scenario, timeLimit):
+        scenario.getCostMatrix()
+        solver = TSPSolver(None)
+        solver.setupWithScenario(scenario)
+        return solver, timeLimit
+
+    def run(self, state) -> int:
+        solver, timeLimit = state
+        with contextlib.redirect_stdout(sys.stderr):
+            results = self.solve(solver, timeLimit)
+        return 1 if self.workField is None else int(results[self.workField])
+
+    def solve(self, solver, timeLimit):
+        return getattr(solver, self.method)(time_allowance=timeLimit)
+
+
+class GreedyBenchmark(SolverBenchmark):
+    name = 'greedy'
+    unit = 'solves'
+    method = 'greedy'
+
+
+class BranchAndBoundBenchmark(SolverBenchmark):
+    name = 'branchAndBound'
+    unit = 'nodes'
+    workField = 'total'
+
+    # The plain search, without the Held-Karp hand-off for small scenarios
+    def solve(self, solver, timeLimit):
+        return solver.branchAndBound(time_allowance=timeLimit, heldKarpThreshold=0)
+
+
+class RandomTourBenchmark(SolverBenchmark):
+    name = 'defaultRandomTour'
+    unit = 'tours'
+    method = 'defaultRandomTour'
+    workField = 'count'
+
+
+BENCHMARKS = {benchmark.name: benchmark for benchmark in
+              (CostToBenchmark, CostMatrixBenchmark, MatrixConstructionBenchmark, ReduceBenchmark,
+               SelectBenchmark, ChildNodesBenchmark, GreedyBenchmark, BranchAndBoundBenchmark,
+               RandomTourBenchmark)}
+
+# Metric -> True when bigger is better
+METRICS = {'throughput': True, 'latency': False, 'peakMemory': False}
+
+
+def reseed(seed):
+    random.seed(seed)
+    numpy.random.seed(seed)
+
+
+# Each repetition repeats setup() + run() until MIN_SAMPLE_TIME of run()
+# time has been measured, so microsecond kernels are not timer noise.
+# Latency and throughput are medians over repetitions; one more run under
+# tracemalloc gives the peak memory allocated by run() itself.
+# Time complexity: O(repeats) benchmark runs, more for fast kernels
+# Space complexity: whatever the benchmark allocates
+MIN_SAMPLE_TIME = 0.05
+
+
+def measure(benchmark, scenario, seed, timeLimit, repeats):
+    latencies = []
+    rates = []
+    for _ in range(repeats):
+        reseed(seed)
+        elapsed = 0.0
+        work = 0
+        runs = 0
+        while elapsed < MIN_SAMPLE_TIME:
+            state = benchmark.setup(scenario, timeLimit)
+            startTime = time.perf_counter()
+            work += benchmark.run(state)
+            elapsed += time.perf_counter() - startTime
+            runs += 1
+        latencies.append(elapsed / runs)
+        rates.append(work / elapsed)
+
+    reseed(seed)
+    state = benchmark.setup(scenario, timeLimit)
+    tracemalloc.start()
+    benchmark.run(state)
+    peakMemory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {'unit': benchmark.unit, 'latency': statistics.median(latencies),
+            'throughput': statistics.median(rates), 'peakMemory': peakMemory}
+
+
+def caseKey(benchmarkName, difficulty, size, seed):
+    return '{}/{}/{}/{}'.format(benchmarkName, difficulty, size, seed)
+
+
+def runSuite(benchmarkNames, difficulties, sizes, seeds, timeLimit, repeats):
+    cases = {}
+    for name in benchmarkNames:
+        benchmark = BENCHMARKS[name]()
+        for difficulty in difficulties:
+            for size in sizes:
+                for seed in seeds:
+                    scenario = generateScenario(size, seed, difficulty)
+                    key = caseKey(name, difficulty, size, seed)
+                    cases[key] = measure(benchmark, scenario, seed, timeLimit, repeats)
+                    print('{:<55} {:>14.1f} {}/s {:>10.6f}s {:>12,d}B'.format(
+                        key, cases[key]['throughput'], benchmark.unit, cases[key]['latency'],
+                        cases[key]['peakMemory']), file=sys.stderr)
+    return {'timeLimit': timeLimit, 'repeats': repeats, 'cases': cases}
+
+
+# A metric regresses when it is more than tolerance worse than the
+# baseline (lower throughput, higher latency or peak memory). Cases
+# missing from either report are skipped.
+# Returns a list of (case, metric, baseline value, current value)
+def findRegressions(baseline, current, tolerance):
+    regressions = []
+    for key, metrics in current['cases'].items():
+        if key not in baseline['cases']:
+            continue
+
+        for metric, higherIsBetter in METRICS.items():
+            before, after = baseline['cases'][key][metric], metrics[metric]
+            if higherIsBetter:
+                regressed = after < before * (1.0 - tolerance)
+            else:
+                regressed = after > before * (1.0 + tolerance)
+            if regressed:
+                regressions.append((key, metric, before, after))
+    return regressions
+
+
+def parseArguments(arguments):
+    parser = argparse.ArgumentParser(description='Benchmark TSP kernels and solvers.')
+    parser.add_argument('--benchmarks', nargs='+', default=list(BENCHMARKS), choices=list(BENCHMARKS))
+    parser.add_argument('--difficulties', nargs='+', default=['Easy', 'Normal', 'Hard (Deterministic)'])
+    parser.add_argument('--sizes', nargs='+', type=int, default=[15, 40])
+    parser.add_argument('--seeds', nargs='+', type=int, default=[20])
+    parser.add_argument('--time', type=float, default=2.0, help='time limit per solver run in seconds')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--save', help='write the report to this file as the new baseline')
+    parser.add_argument('--compare', help='baseline report to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed relative slowdown or memory growth before flagging')
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    parsed = parseArguments(arguments)
+    report = runSuite(parsed.benchmarks, parsed.difficulties, parsed.sizes, parsed.seeds,
+                      parsed.time, parsed.repeats)
+
+    if parsed.save is not None:
+        with open(parsed.save, 'w') as stream:
+            json.dump(report, stream, indent=2)
+
+    if parsed.compare is not None:
+        with open(parsed.compare) as stream:
+            baseline = json.load(stream)
+        regressions = findRegressions(baseline, report, parsed.tolerance)
+        for key, metric, before, after in regressions:
+            print('REGRESSION {} {}: {:.6g} -> {:.6g}'.format(key, metric, before, after))
+        print('{} regression(s) against {}'.format(len(regressions), parsed.compare))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
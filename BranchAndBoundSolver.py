@@ -1,77 +1,213 @@
 from ReducedCostMatrix import ReducedCostMatrix
 from BranchNode import BranchNode
-from queue import PriorityQueue
-from copy import deepcopy
+from NodeFrontier import NodeFrontier
+from SearchStrategy import createStrategy
+from TranspositionTable import TranspositionTable
+from LowerBounds import createLowerBound
 from BaseSolver import BaseSolver
 from GreedySolver import GreedySolver
+from SearchCheckpoint import SearchCheckpoint
 from random import randrange
 import math
+import numpy
 
 
 class BranchAndBoundSolver(BaseSolver):
-    def __init__(self, tspSolver, maxNodes, maxTime):
+    # Default size of the dominance table; 0 disables it
+    MAX_TRANSPOSITIONS = 200000
+
+    # Default seconds between checkpoints when a checkpoint path is given
+    CHECKPOINT_INTERVAL = 60.0
+
+    # With resumeFrom, the search continues from that checkpoint with the
+    # checkpoint's strategy and bound. With checkpointPath, the search state
+    # is saved there every checkpointInterval seconds and when the run ends.
+    def __init__(self, tspSolver, maxNodes, maxTime, strategy='costPerDepth',
+                 maxTranspositions=MAX_TRANSPOSITIONS, bound='reduced', checkpointPath=None,
+                 checkpointInterval=CHECKPOINT_INTERVAL, resumeFrom=None):
         super().__init__(tspSolver, maxTime)
-        self.nodeQueue = PriorityQueue(maxNodes)
+        self.resumeCheckpoint = None
+        if resumeFrom is not None:
+            self.resumeCheckpoint = SearchCheckpoint.load(resumeFrom)
+            self.resumeCheckpoint.checkScenario(self.getScenario())
+            strategy = self.resumeCheckpoint.metadata['strategy']
+            bound = self.resumeCheckpoint.metadata['bound']
+        self.checkpointPath = checkpointPath
+        self.checkpointInterval = checkpointInterval
+        self.nextCheckpointTime = checkpointInterval
+        self.checkpointsWritten = 0
+        self.previousSearchTime = 0.0
+        self.strategy = createStrategy(strategy)
+        self._results['strategy'] = self.strategy.name
+        self.lowerBound = createLowerBound(bound)
+        self._results['bound'] = self.lowerBound.name
+        self.nodeQueue = NodeFrontier(maxNodes)
+        self.transpositions = TranspositionTable(maxTranspositions) if maxTranspositions else None
+        self.dominated = 0
         self.setMaxConcurrentNodes(0)
-        self.tryUpdateMaxConcurrentNodes(self.nodeQueue.qsize())
 
     # Creates a route through cities, pruning as it goes
     # Time complexity:
     #   Initial BSSF is N^3
     #   Each Branch has N - depth subproblems, each N^2
-    #   Each node being queued is log(queue size)
+    #   Each node being queued is log(queue size), amortized with evictions
     #   Total Time complexity: O(N! * N^2)
-    # Space complexity: q = size of queue, each node is N^2;
-    #   O(q * N^2)
+    # Space complexity: q = size of queue, each node is N;
+    #   O(q * N + N^2)
     def run(self):
-        greedySolver = GreedySolver(self.getTSPSolver(), self.getMaxTime())
-        greedySolver.solve()
-        self.setBSSF(greedySolver.getBSSF())
-        if self.exceededMaxTime():
-            return
+        if self.resumeCheckpoint is not None:
+            startIndex = self.resume(self.resumeCheckpoint)
+        else:
+            instrumentation = self.getInstrumentation()
+            phaseStart = instrumentation.clock()
+            greedySolver = GreedySolver(self.getTSPSolver(), self.getMaxTime())
+            greedySolver.solve()
+            self.setBSSF(greedySolver.getBSSF())
+            instrumentation.addPhaseTime('initialBSSF', phaseStart)
+            if self.exceededMaxTime():
+                return
+
+            startIndex, rootNode = self.createRootNode()
+            self.incrementTotal()
+            if rootNode.get_cost() < self.getBSSFCost():
+                self.nodeQueue.push(self.getNodeKey(rootNode), rootNode)
+
+        self.search(startIndex)
+        self._results['searchTime'] = self.previousSearchTime + self.getClampedTime()
+        self._results['checkpoints'] = self.checkpointsWritten
+        print('Final (time: {0:.3f})'.format(self.getClampedTime()))
 
+    # Restores the frontier, BSSF, counters, strategy state and RNG state.
+    # The transposition table is not saved and starts empty.
+    # Time complexity: O(q * (N + log q))
+    # Space complexity: O(q * N)
+    def resume(self, checkpoint) -> int:
+        metadata = checkpoint.metadata
+        checkpoint.restoreRandomState()
+        if checkpoint.getBSSFIndices() is not None:
+            self.setBSSFFromIndices(checkpoint.getBSSFIndices())
+        self.incrementTotal(metadata['total'])
+        self.incrementPruned(metadata['pruned'])
+        self.incrementSolutionCount(metadata['solutionCount'])
+        self.dominated = metadata['dominated']
+        self.previousSearchTime = metadata['searchTime']
+        self.strategy.setState(metadata['strategyState'])
+
+        for node in checkpoint.getNodes():
+            self.incrementPruned(self.nodeQueue.push(self.getNodeKey(node), node))
+        return metadata['startIndex']
+
+    # Saves the search state to checkpointPath, replacing the previous file
+    # Time complexity: O(q * (N + log q))
+    # Space complexity: O(q * N)
+    def writeCheckpoint(self, startIndex):
+        metadata = {'startIndex': startIndex, 'strategy': self.strategy.name,
+                    'strategyState': self.strategy.getState(), 'bound': self.lowerBound.name,
+                    'total': self._total, 'pruned': self._pruned,
+                    'solutionCount': self._intermediateCount, 'dominated': self.dominated,
+                    'searchTime': self.previousSearchTime + self.getClampedTime()}
+        bssfIndices = None if self.getBSSF() is None else self.getBSSF().getIndices()
+        checkpoint = SearchCheckpoint.capture(self.getScenario(), self.nodeQueue.getNodes(), bssfIndices, metadata)
+        checkpoint.save(self.checkpointPath)
+        self.checkpointsWritten += 1
+        self.nextCheckpointTime = self.getTotalTime() + self.checkpointInterval
+
+    # Time complexity: O(N^2)
+    # Space complexity: O(N^2)
+    def createRootNode(self):
         startIndex = randrange(self.getCityCount())
-        startCity = self.getCityAt(startIndex)
         startMatrix = ReducedCostMatrix(self.getScenario())
         startMatrix.reduce()
 
-        rootNode = BranchNode(startMatrix, startCity, startIndex, None)
-        self.incrementTotal()
-        if rootNode.get_cost() < self.getBSSFCost():
-            self.nodeQueue.put((self.getNodeKey(rootNode), rootNode))
-            self.tryUpdateMaxConcurrentNodes(self.nodeQueue.qsize())
+        rootNode = BranchNode(numpy.array([startIndex], dtype=numpy.int32), startMatrix,
+                              lowerBound=self.lowerBound)
+        return startIndex, rootNode
 
+    # Expands queued nodes until the frontier is empty or time runs out.
+    # A node whose residual lower bound hasn't been added yet is bounded on
+    # its first pop and pushed back with the tighter key, unless that
+    # already prunes it.
+    # Instrumentation phases: queue (frontier pops, pushes and re-keys),
+    # expansion (generate_child_nodes) and bounding (lower bound evaluation,
+    # see boundStats for its share, BSSF pruning, dominance and tour
+    # completion checks).
+    # Time complexity: O(N! * N^2)
+    # Space complexity: O(q * N + N^2)
+    def search(self, startIndex):
+        instrumentation = self.getInstrumentation()
         while not self.nodeQueue.empty() and not self.exceededMaxTime():
-            currentNode = self.nodeQueue.get()[1]
+            if self.checkpointPath is not None and self.getTotalTime() >= self.nextCheckpointTime:
+                self.writeCheckpoint(startIndex)
+            instrumentation.recordNodes(self._total)
+            phaseStart = instrumentation.clock()
+            currentNode = self.nodeQueue.pop()
+            instrumentation.addPhaseTime('queue', phaseStart)
 
             if currentNode.get_cost() >= self.getBSSFCost():
                 self.incrementPruned()
                 continue
 
+            if (self.lowerBound.residual and not currentNode.is_bounded()
+                    and currentNode.get_depth() < self.getCityCount()):
+                phaseStart = instrumentation.clock()
+                currentNode.apply_lower_bound(self.getScenario(), self.lowerBound)
+                instrumentation.addPhaseTime('bounding', phaseStart)
+                if currentNode.get_cost() >= self.getBSSFCost():
+                    self.incrementPruned()
+                else:
+                    phaseStart = instrumentation.clock()
+                    self.incrementPruned(self.nodeQueue.push(self.getNodeKey(currentNode), currentNode))
+                    instrumentation.addPhaseTime('queue', phaseStart)
+                continue
+
             if currentNode.get_depth() == self.getCityCount():
-                loopCost = currentNode.get_city().costTo(startCity)
+                phaseStart = instrumentation.clock()
+                if self.strategy.onLeaf():
+                    self.nodeQueue.rekey(self.getNodeKey)
+                    instrumentation.addPhaseTime('queue', phaseStart)
+                    phaseStart = instrumentation.clock()
+
+                loopCost = self.getCostMatrix()[currentNode.get_city_index(), startIndex]
                 if loopCost == math.inf or loopCost >= self.getBSSFCost():
+                    instrumentation.addPhaseTime('bounding', phaseStart)
                     continue
 
-                route = currentNode.compute_path()
-                self.setBSSFFromRoute(route)
+                self.setBSSFFromIndices(currentNode.get_path())
                 self.incrementSolutionCount()
+                instrumentation.addPhaseTime('bounding', phaseStart)
                 print('Solution (time: {0:.3f})'.format(self.getClampedTime()))
                 continue
 
-            currentNode.generate_child_nodes(self.getCities())
-            self.incrementTotal(currentNode.get_child_count())
+            phaseStart = instrumentation.clock()
+            children = currentNode.generate_child_nodes(self.getScenario())
+            self.incrementTotal(len(children))
+            instrumentation.addPhaseTime('expansion', phaseStart)
 
-            for childNode in currentNode.get_children():
-                if not self.nodeQueue.full() and childNode.get_cost() < self.getBSSFCost():
-                    self.nodeQueue.put((self.getNodeKey(childNode), childNode))
-                else:
+            for childNode in children:
+                phaseStart = instrumentation.clock()
+                if childNode.get_cost() >= self.getBSSFCost():
                     self.incrementPruned()
+                    instrumentation.addPhaseTime('bounding', phaseStart)
+                elif self.transpositions is not None and self.transpositions.isDominated(childNode):
+                    self.dominated += 1
+                    instrumentation.addPhaseTime('bounding', phaseStart)
+                else:
+                    instrumentation.addPhaseTime('bounding', phaseStart)
+                    phaseStart = instrumentation.clock()
+                    # Evicted nodes are dropped from the search, count them as pruned
+                    self.incrementPruned(self.nodeQueue.push(self.getNodeKey(childNode), childNode))
+                    instrumentation.addPhaseTime('queue', phaseStart)
 
-            self.tryUpdateMaxConcurrentNodes(self.nodeQueue.qsize())
-
-        self.incrementPruned(self.nodeQueue.qsize())
-        print('Final (time: {0:.3f})'.format(self.getClampedTime()))
+        # Nodes left in the frontier are only pruned if nothing resumes them
+        if self.checkpointPath is not None:
+            self.writeCheckpoint(startIndex)
+        self.incrementPruned(len(self.nodeQueue))
+        self.setMaxConcurrentNodes(self.nodeQueue.getStats()['peak'])
+        self._results['frontier'] = self.nodeQueue.getStats()
+        self._results['dominated'] = self.dominated
+        self._results['boundStats'] = self.lowerBound.getStats()
+        if self.transpositions is not None:
+            self._results['transpositions'] = self.transpositions.getStats()
 
     def getNodeKey(self, branchNode):
-        return branchNode.get_cost() / branchNode.get_depth()
+        return self.strategy.getKey(branchNode)
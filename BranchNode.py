@@ -1,72 +1,120 @@
 from ReducedCostMatrix import ReducedCostMatrix
 from TSPClasses import City
-from copy import deepcopy
 from typing import List
 import math
+import numpy
 
 
+# Nodes only keep the partial path, the bound and the accumulated row/column
+# reductions (O(N) each). The reduced cost matrix is rebuilt from the
+# scenario costs when the node is expanded. The visited bitset and actual
+# path cost are kept for dominance checks. The bound is the reduced cost
+# plus whatever the optional LowerBound adds on the residual problem.
+# Children start with the reduced cost alone; the residual bound is added
+# by apply_lower_bound once the search pops them.
 class BranchNode:
-    def __init__(self, matrix: ReducedCostMatrix, city: City, cityIndex: int, parent):
+    def __init__(self, path, matrix: ReducedCostMatrix, pathCost=0.0, visited=None, lowerBound=None):
         super().__init__()
 
-        self.depth = 1 if parent is None else parent.get_depth() + 1
-        self.matrix = matrix
-        self.children = []
-        self.cityIndex = cityIndex
-        self.city = city
-        self.parent = parent
+        self.path = path
+        self.pathCost = pathCost
+        self.visited = 1 << int(path[-1]) if visited is None else visited
+        self.reducedCost = matrix.get_cost()
+        self.cost = self.reducedCost
+        self.bounded = lowerBound is not None
+        if self.bounded:
+            self.cost += lowerBound.evaluate(matrix, path)
+        # Kept as float64 like the cost matrix; a narrower type overflows
+        # on large coordinates and rebuilds wrong matrices
+        self.rowReduction = matrix.rowReduction.copy()
+        self.colReduction = matrix.colReduction.copy()
+
+    # Recreates a node from the fields a search checkpoint stores; the
+    # visited bitset follows from the path
+    @staticmethod
+    def restore(path, reducedCost, cost, rowReduction, colReduction, pathCost):
+        node = BranchNode.__new__(BranchNode)
+        node.path = path
+        node.pathCost = pathCost
+        node.visited = 0
+        for index in path.tolist():
+            node.visited |= 1 << index
+        node.reducedCost = reducedCost
+        node.cost = cost
+        node.bounded = cost > reducedCost
+        node.rowReduction = rowReduction
+        node.colReduction = colReduction
+        return node
 
     def __lt__(self, other):
         return self.get_cost() < other.get_cost()
 
-    # Recursively traverses tree to compute route from a particular node
+    # Maps the stored index path back to cities
     # Time complexity: O(N)
-    # Space complexity: Fills an array with nodes in the computed route: O(N)
-    def compute_path(self) -> List[City]:
-        if self.get_parent() is None:
-            return [self.get_city()]
-
-        parent = self.get_parent()
-        path = parent.compute_path()
-        path.append(self.get_city())
-        return path
-
-    # Creates child nodes the current city has a valid path to
+    # Space complexity: O(N)
+    def compute_path(self, cities: List[City]) -> List[City]:
+        return [cities[index] for index in self.get_path()]
+
+    # Rebuilds this node's reduced cost matrix
+    # Time complexity: O(N^2)
+    # Space complexity: O(N^2)
+    def build_rcm(self, scenario) -> ReducedCostMatrix:
+        return ReducedCostMatrix.rebuild(scenario, self.get_path(), self.reducedCost,
+                                         self.rowReduction, self.colReduction)
+
+    # Adds the lower bound's residual value to the reduced cost. Deferred
+    # until the node is popped, so children pruned on their reduced cost or
+    # left in the frontier never pay for it.
+    # Time complexity: O(N^2) plus one lower bound evaluation
+    # Space complexity: O(N^2)
+    def apply_lower_bound(self, scenario, lowerBound):
+        self.cost = self.reducedCost + lowerBound.evaluate(self.build_rcm(scenario), self.get_path())
+        self.bounded = True
+
+    # Creates child nodes the current city has a valid path to. The parent
+    # matrix only lives for the duration of the expansion, and the children
+    # are returned rather than kept so expanded nodes can be freed.
     # Time complexity: A for loop with O(N^2) operations within; O(N^3)
-    # Space complexity: N children each using N^2; O(N^3)
-    def generate_child_nodes(self, cities: List[City]):
+    # Space complexity: O(N^2) while expanding, O(N) per child afterwards
+    def generate_child_nodes(self, scenario):
+        children = []
+        parentMatrix = self.build_rcm(scenario)
         fromIndex = self.get_city_index()
-        for toIndex in range(self.get_rcm().get_col_count()):
+        for toIndex in range(parentMatrix.get_col_count()):
 
-            cost = self.get_rcm().get_value_at(fromIndex, toIndex)
+            cost = parentMatrix.get_value_at(fromIndex, toIndex)
             if cost < math.inf:
-                rcm = deepcopy(self.get_rcm())
+                rcm = parentMatrix.copy()
                 rcm.select(fromIndex, toIndex)
                 rcm.reduce()
 
-                child = BranchNode(rcm, cities[toIndex], toIndex, self)
-                self.children.append(child)
+                childPath = numpy.append(self.get_path(), numpy.int32(toIndex))
+                childPathCost = self.pathCost + scenario.getCostMatrix()[fromIndex, toIndex]
+                childVisited = self.visited | (1 << toIndex)
+                children.append(BranchNode(childPath, rcm, childPathCost, childVisited))
+
+        return children
 
     def get_depth(self) -> int:
-        return self.depth
+        return len(self.path)
 
     def get_city_index(self) -> int:
-        return self.cityIndex
+        return int(self.path[-1])
 
-    def get_rcm(self) -> ReducedCostMatrix:
-        return self.matrix
+    def get_path(self):
+        return self.path
 
-    def get_parent(self):
-        return self.parent
+    # False until the residual lower bound has been added to the cost
+    def is_bounded(self) -> bool:
+        return self.bounded
 
-    def get_city(self) -> City:
-        return self.city
+    # Bitset of visited city indices
+    def get_visited(self) -> int:
+        return self.visited
 
-    def get_cost(self) -> float:
-        return self.get_rcm().get_cost()
-
-    def get_children(self):
-        return self.children
+    # Sum of the original edge costs along the path, without reductions
+    def get_path_cost(self) -> float:
+        return self.pathCost
 
-    def get_child_count(self) -> int:
-        return len(self.get_children())
+    def get_cost(self) -> float:
+        return self.cost
@@ -0,0 +1,49 @@
+from abc import abstractmethod
+import math
+
+
+# Maps annealing progress (0 at the start of a cycle, 1 at the deadline)
+# to a temperature. Every schedule ends at END_RATIO of its start.
+class CoolingSchedule:
+    name = None
+
+    END_RATIO = 1e-3
+
+    @abstractmethod
+    def getTemperature(self, startTemperature, progress) -> float:
+        pass
+
+
+# T0 * r^progress, the same fraction lost per unit of time
+class GeometricCooling(CoolingSchedule):
+    name = 'geometric'
+
+    def getTemperature(self, startTemperature, progress) -> float:
+        return startTemperature * self.END_RATIO ** progress
+
+
+# Straight line from T0 down to T0 * r
+class LinearCooling(CoolingSchedule):
+    name = 'linear'
+
+    def getTemperature(self, startTemperature, progress) -> float:
+        return startTemperature * (1.0 - progress * (1.0 - self.END_RATIO))
+
+
+# Drops quickly, then spends most of the run near the final temperature
+class LogarithmicCooling(CoolingSchedule):
+    name = 'logarithmic'
+
+    def getTemperature(self, startTemperature, progress) -> float:
+        scale = (1.0 / self.END_RATIO - 1.0) / math.log(100.0)
+        return startTemperature / (1.0 + scale * math.log(1.0 + 99.0 * progress))
+
+
+SCHEDULES = {schedule.name: schedule for schedule in
+             (GeometricCooling, LinearCooling, LogarithmicCooling)}
+
+
+def createSchedule(name) -> CoolingSchedule:
+    if name not in SCHEDULES:
+        raise ValueError('Unknown cooling schedule: {}'.format(name))
+    return SCHEDULES[name]()
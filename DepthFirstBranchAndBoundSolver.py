@@ -0,0 +1,126 @@
+from ReducedCostMatrix import ReducedCostMatrix
+from BaseSolver import BaseSolver
+from GreedySolver import GreedySolver
+from random import randrange
+import math
+
+
+# Children of one node on the DFS path, best bound last so pop() takes it
+class DepthFirstFrame:
+    def __init__(self, checkpoint, children):
+        super().__init__()
+
+        self.checkpoint = checkpoint
+        self.children = children
+
+
+class DepthFirstBranchAndBoundSolver(BaseSolver):
+    def __init__(self, tspSolver, maxTime):
+        super().__init__(tspSolver, maxTime)
+        self.setMaxConcurrentNodes(0)
+        self.pendingNodes = 0
+        self.matrix = None
+        self.path = []
+
+    # Depth-first branch and bound over a single working matrix. Each
+    # select/reduce is recorded on the matrix's undo stack and rolled back
+    # on backtrack, so nothing larger than O(N) is stored per tree level.
+    # Time complexity:
+    #   Initial BSSF is N^3
+    #   Each Branch has N - depth subproblems, each N^2
+    #   Total Time complexity: O(N! * N^2)
+    # Space complexity: working matrix plus O(N) undo state and pending
+    #   children per level; O(N^2)
+    def run(self):
+        greedySolver = GreedySolver(self.getTSPSolver(), self.getMaxTime())
+        greedySolver.solve()
+        self.setBSSF(greedySolver.getBSSF())
+        if self.exceededMaxTime():
+            return
+
+        startIndex = randrange(self.getCityCount())
+        self.matrix = ReducedCostMatrix(self.getScenario())
+        self.matrix.reduce()
+        self.matrix.enableUndo()
+        self.path = [startIndex]
+
+        self.incrementTotal()
+        if self.matrix.get_cost() >= self.getBSSFCost():
+            self.incrementPruned()
+            return
+
+        frames = [DepthFirstFrame(self.matrix.checkpoint(), self.orderChildren())]
+        while frames and not self.exceededMaxTime():
+            frame = frames[-1]
+            if not frame.children:
+                self.matrix.rollback(frame.checkpoint)
+                self.path.pop()
+                frames.pop()
+                continue
+
+            bound, toIndex = frame.children.pop()
+            self.pendingNodes -= 1
+            if bound >= self.getBSSFCost():
+                # Children are sorted, so every remaining sibling is pruned too
+                self.incrementPruned(len(frame.children) + 1)
+                self.pendingNodes -= len(frame.children)
+                frame.children.clear()
+                continue
+
+            checkpoint = self.matrix.checkpoint()
+            self.matrix.select(self.path[-1], toIndex)
+            self.matrix.reduce()
+            self.path.append(toIndex)
+
+            if len(self.path) == self.getCityCount():
+                self.tryCompleteTour(startIndex)
+                self.matrix.rollback(checkpoint)
+                self.path.pop()
+                continue
+
+            frames.append(DepthFirstFrame(checkpoint, self.orderChildren()))
+
+        self.incrementPruned(self.pendingNodes)
+        print('Final (time: {0:.3f})'.format(self.getClampedTime()))
+
+    # Evaluates every child of the current path end in place and rolls each
+    # one back, returning the unpruned ones ordered for pop()
+    # Time complexity: O(N^3)
+    # Space complexity: O(N)
+    def orderChildren(self):
+        children = []
+        fromIndex = self.path[-1]
+        for toIndex in range(self.matrix.get_col_count()):
+            if self.matrix.get_value_at(fromIndex, toIndex) == math.inf:
+                continue
+
+            checkpoint = self.matrix.checkpoint()
+            self.matrix.select(fromIndex, toIndex)
+            self.matrix.reduce()
+            bound = self.matrix.get_cost()
+            self.matrix.rollback(checkpoint)
+
+            self.incrementTotal()
+            if bound < self.getBSSFCost():
+                children.append((bound, toIndex))
+            else:
+                self.incrementPruned()
+
+        children.sort(reverse=True)
+        self.pendingNodes += len(children)
+        self.tryUpdateMaxConcurrentNodes(self.pendingNodes)
+        return children
+
+    # The reduced matrix still holds the closing edge, so the full tour
+    # cost is the bound plus its reduced value
+    # Time complexity: O(N)
+    # Space complexity: O(N)
+    def tryCompleteTour(self, startIndex):
+        tourCost = self.matrix.get_cost() + self.matrix.get_value_at(self.path[-1], startIndex)
+        if tourCost >= self.getBSSFCost():
+            self.incrementPruned()
+            return
+
+        self.setBSSFFromIndices(self.path)
+        self.incrementSolutionCount()
+        print('Solution (time: {0:.3f})'.format(self.getClampedTime()))
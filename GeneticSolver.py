@@ -0,0 +1,142 @@
+from BaseSolver import BaseSolver
+from GreedySolver import GreedySolver
+from GreedySolver import nearestNeighborTours
+import math
+import numpy
+
+
+class GeneticSolver(BaseSolver):
+    POPULATION_SIZE = 256
+
+    # Best tours copied unchanged into the next generation
+    ELITE_COUNT = 8
+
+    TOURNAMENT_SIZE = 3
+
+    # Chance that a child gets one random swap of two cities
+    MUTATION_RATE = 0.3
+
+    # Share of the population seeded with nearest-neighbor tours
+    GREEDY_SEED_FRACTION = 0.25
+
+    # Share of the time allowance the greedy and random seeds may use
+    SEED_TIME_FRACTION = 0.1
+
+    def __init__(self, tspSolver, maxTime, populationSize=POPULATION_SIZE):
+        super().__init__(tspSolver, maxTime)
+        self.populationSize = max(populationSize, self.ELITE_COUNT + 2)
+        self.random = numpy.random.default_rng()
+        self.generations = 0
+
+    # The population is one (P, N) int array of tours. Each generation is
+    # scored with a single gather-and-sum over a penalized cost matrix in
+    # which a missing edge costs more than any complete tour, so
+    # infeasible Hard-mode tours always rank behind feasible ones and
+    # among themselves by how many missing edges they use. Parents come
+    # from vectorized tournaments, children from order crossover (OX) and
+    # swap mutation over the whole population at once.
+    # Time complexity: O(P * N) array work per generation
+    # Space complexity: O(P * N + N^2)
+    def run(self):
+        seedTime = self.getMaxTime() * self.SEED_TIME_FRACTION
+        greedySolver = GreedySolver(self.getTSPSolver(), seedTime)
+        greedySolver.solve()
+        self.setBSSF(greedySolver.getBSSF())
+        self.incrementSolutionCount(greedySolver.getResults()['count'])
+        if self.getCityCount() < 5:
+            return
+
+        costs = self.getCostMatrix()
+        finite = numpy.isfinite(costs)
+        self.penalizedCosts = numpy.where(finite, costs, costs[finite].max() * self.getCityCount() + 1)
+
+        population = self.seedPopulation(costs, seedTime)
+        while not self.exceededMaxTime():
+            fitness = self.evaluate(population)
+            self.incrementTotal(len(population))
+            self.tryUpdateBSSF(population, fitness)
+
+            elites = numpy.argpartition(fitness, self.ELITE_COUNT - 1)[:self.ELITE_COUNT]
+            childCount = self.populationSize - self.ELITE_COUNT
+            firstParents = population[self.tournament(fitness, childCount)]
+            secondParents = population[self.tournament(fitness, childCount)]
+            children = self.orderCrossover(firstParents, secondParents)
+            self.mutate(children)
+
+            population = numpy.concatenate((population[elites], children))
+            self.generations += 1
+
+        self._results['generations'] = self.generations
+
+    # Greedy BSSF, the default random tour, nearest-neighbor tours from
+    # random start cities and random permutations for the rest
+    # Time complexity: O(G * N^2) for G nearest-neighbor seeds
+    # Space complexity: O(P * N)
+    def seedPopulation(self, costs, seedTime):
+        cityCount = self.getCityCount()
+        seeds = []
+        if self.getBSSF() is not None:
+            seeds.append(self.getBSSF().getIndices())
+        randomTour = self.getTSPSolver().defaultRandomTour(seedTime)['soln']
+        seeds.append(randomTour.getIndices())
+
+        greedyCount = int(self.populationSize * self.GREEDY_SEED_FRACTION)
+        starts = self.random.choice(cityCount, size=min(greedyCount, cityCount), replace=False)
+        tours, tourCosts = nearestNeighborTours(costs, starts)
+        seeds.extend(tours[tourCosts < math.inf])
+
+        seeds = numpy.array(seeds[:self.populationSize], dtype=numpy.int32)
+        randomCount = self.populationSize - len(seeds)
+        randomTours = self.random.permuted(
+            numpy.tile(numpy.arange(cityCount, dtype=numpy.int32), (randomCount, 1)), axis=1)
+        return numpy.concatenate((seeds, randomTours))
+
+    # Time complexity: O(P * N)
+    # Space complexity: O(P * N)
+    def evaluate(self, population):
+        return self.penalizedCosts[population, numpy.roll(population, -1, axis=1)].sum(axis=1)
+
+    def tryUpdateBSSF(self, population, fitness):
+        best = fitness.argmin()
+        if fitness[best] < self.getBSSFCost():
+            self.setBSSFFromIndices(population[best])
+            self.incrementSolutionCount()
+
+    # Index of the fittest of TOURNAMENT_SIZE random tours, count times
+    # Time complexity: O(count * T)
+    # Space complexity: O(count * T)
+    def tournament(self, fitness, count):
+        entrants = self.random.integers(len(fitness), size=(count, self.TOURNAMENT_SIZE))
+        return entrants[numpy.arange(count), fitness[entrants].argmin(axis=1)]
+
+    # Each child keeps a slice of its first parent and takes the remaining
+    # cities in the order they appear in its second parent, read from the
+    # end of the slice. The slice length is shared across the generation so
+    # the filtered second parents reshape into a rectangle; slice starts
+    # differ per child. Tours are cyclic, so children are left rotated to
+    # start at their slice.
+    # Time complexity: O(P * N)
+    # Space complexity: O(P * N)
+    def orderCrossover(self, firstParents, secondParents):
+        count, cityCount = firstParents.shape
+        rows = numpy.arange(count)[:, numpy.newaxis]
+        length = int(self.random.integers(1, cityCount))
+        starts = self.random.integers(cityCount, size=count)[:, numpy.newaxis]
+        offsets = numpy.arange(cityCount)
+
+        kept = firstParents[rows, (starts + offsets[:length]) % cityCount]
+        donors = secondParents[rows, (starts + length + offsets) % cityCount]
+
+        inKept = numpy.zeros((count, cityCount), dtype=bool)
+        inKept[rows, kept] = True
+        filler = donors[~inKept[rows, donors]].reshape(count, cityCount - length)
+        return numpy.concatenate((kept, filler), axis=1)
+
+    # Time complexity: O(P)
+    # Space complexity: O(P)
+    def mutate(self, children):
+        count, cityCount = children.shape
+        rows = numpy.flatnonzero(self.random.random(count) < self.MUTATION_RATE)
+        first = self.random.integers(cityCount, size=len(rows))
+        second = self.random.integers(cityCount, size=len(rows))
+        children[rows, first], children[rows, second] = children[rows, second], children[rows, first]
@@ -1,86 +1,86 @@
 from BaseSolver import BaseSolver
 from random import randrange
 import math
-
-
-# Time complexity: O(N)
-# Space complexity: O(1)
-def getRouteCost(route):
-    cost = 0
-    routeLength = len(route)
-
-    for i in range(1, routeLength):
-        previous = route[i - 1]
-        current = route[i]
-        cost += previous.costTo(current)
-
-    cost += route[routeLength - 1].costTo(route[0])
-    return cost
+import time
+import numpy
+
+
+# Grows a nearest-neighbor tour from every start city at once. Each step
+# gathers the cost rows of the current cities, masks visited cities and
+# takes a row-wise argmin; ties go to the lowest index. Tours that hit a
+# dead end or cannot close the loop get an INF cost.
+# Time complexity: N steps of O(B * N) array work -> O(B * N^2)
+# Space complexity: O(B * N)
+def nearestNeighborTours(costMatrix, starts):
+    batchSize = len(starts)
+    cityCount = costMatrix.shape[0]
+    rows = numpy.arange(batchSize)
+
+    tours = numpy.empty((batchSize, cityCount), dtype=numpy.int32)
+    tours[:, 0] = starts
+    visited = numpy.zeros((batchSize, cityCount), dtype=bool)
+    visited[rows, starts] = True
+    costs = numpy.zeros(batchSize)
+
+    current = numpy.asarray(starts)
+    for step in range(1, cityCount):
+        stepCosts = costMatrix[current]
+        stepCosts[visited] = math.inf
+        target = stepCosts.argmin(axis=1)
+
+        costs += stepCosts[rows, target]
+        visited[rows, target] = True
+        tours[:, step] = target
+        current = target
+
+    costs += costMatrix[current, starts]
+    return tours, costs
 
 
 class GreedySolver(BaseSolver):
+    # Upper bound on batch rows * cities held in memory per step
+    MAX_BATCH_CELLS = 1000000
+
     def __init__(self, tspSolver, maxTime):
         super().__init__(tspSolver, maxTime)
 
-    # Time complexity: A for loop (N) with (N^2) on each iteration -> O(N^3)
-    # Space complexity: O(N)
+    # Tries every start city, in batches that start at a single tour (so a
+    # BSSF exists quickly on large scenarios) and double while the measured
+    # time per tour fits the remaining budget. Falls back to a random tour
+    # when no greedy tour is valid.
+    # Time complexity: O(N^3) array work, no Python-level inner loops
+    # Space complexity: O(B * N)
     def run(self):
-        defaultResults = self.getTSPSolver().defaultRandomTour()
-        route = defaultResults['soln'].route
-        self.setBSSFFromRoute(route)
-        bestCost = self.getBSSFCost()
-
-        startIndex = randrange(self.getCityCount())
-
-        for i in self.getCityRange():
-            if self.exceededMaxTime():
-                return
-
-            original = (startIndex + i) % self.getCityCount()
-            current = original
-            visited = {current}
-            route = [self.getCityAt(current)]
-
-            solution = self.greedySolve(original, current, visited, route)
-            if solution is None:
-                continue
-
-            solutionCost = getRouteCost(solution)
-            if solutionCost < bestCost:
-                self.setBSSFFromRoute(solution)
-                self.incrementSolutionCount()
-                bestCost = solutionCost
-
-    # Time complexity: Recurse at most O(N) times each being O(N) -> O(N^2)
-    # Space complexity: Set and route arrays up to 2N -> O(N)
-    def greedySolve(self, original, current, visited, route):
-        if len(visited) == self.getCityCount():
-            originalCity = self.getCityAt(original)
-            costToOriginal = self.getCityAt(current).costTo(originalCity)
-            return None if costToOriginal == math.inf else route
-
-        target = self.getNextCity(current, visited)
-        if target is None:
-            return None
-        else:
-            visited.add(target)
-            route.append(self.getCityAt(target))
-            return self.greedySolve(original, target, visited, route)
-
-    # Time complexity: O(N)
-    # Space complexity: O(1)
-    def getNextCity(self, source, visited):
-        minCost = math.inf
-        minIndex = None
-
-        for i in self.getCityRange():
-            if i in visited:
-                continue
-
-            target = self.getCityAt(i)
-            costToCity = self.getCityAt(source).costTo(target)
-            if costToCity < minCost:
-                minCost = costToCity
-                minIndex = i
-
-        return minIndex
+        cityCount = self.getCityCount()
+        startIndex = randrange(cityCount)
+        starts = (startIndex + numpy.arange(cityCount)) % cityCount
+        maxBatch = max(1, self.MAX_BATCH_CELLS // cityCount)
+
+        bestCost = math.inf
+        batchSize = 1
+        position = 0
+        while position < cityCount and not self.exceededMaxTime():
+            batchStarts = starts[position:position + batchSize]
+            batchStart = time.time()
+            tours, costs = nearestNeighborTours(self.getCostMatrix(), batchStarts)
+            secondsPerTour = (time.time() - batchStart) / len(batchStarts)
+            position += len(batchStarts)
+
+            bestRow = None
+            for row, cost in enumerate(costs):
+                if cost < bestCost:
+                    bestCost = cost
+                    bestRow = row
+                    self.incrementSolutionCount()
+            if bestRow is not None:
+                self.setBSSFFromIndices(tours[bestRow])
+
+            remainingTime = self.getMaxTime() - self.getTotalTime()
+            affordable = int(remainingTime / secondsPerTour) if secondsPerTour > 0 else maxBatch
+            batchSize = max(1, min(batchSize * 2, maxBatch, affordable))
+
+        # A cancelled run returns without the random-tour fallback
+        if self.getBSSF() is None and not self.getTSPSolver().isCancelled():
+            defaultResults = self.getTSPSolver().defaultRandomTour(max(0.0, self.getMaxTime() - self.getTotalTime()))
+            if defaultResults['cost'] < math.inf:
+                self.setBSSF(defaultResults['soln'])
@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+
+# Runs TSPSolver entry points without the GUI (and without Qt):
+#   python3 HeadlessRunner.py --algorithms greedy branchAndBound --sizes 15 30
+#       --seeds 20 21 --difficulties Normal Hard --time 10 --jobs 4 --output runs.csv
+# Scenarios are generated exactly like Proj5GUI.newPoints / generateNetwork,
+# so a (size, seed, difficulty) row here matches the GUI's scenario.
+from TSPClasses import Scenario
+from TSPSolver import TSPSolver
+from multiprocessing import Pool
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import numpy
+import random
+import sys
+
+DIFFICULTIES = ['Easy', 'Normal', 'Hard', 'Hard (Deterministic)']
+
+# TSPSolver entry points that take a time_allowance and return results
+ALGORITHMS = ['defaultRandomTour', 'greedy', 'branchAndBound', 'heldKarp', 'depthFirstBranchAndBound',
+              'parallelBranchAndBound', 'fancy', 'simulatedAnnealing', 'genetic', 'antColony']
+
+# Entry points that start their own processes; pool workers cannot have
+# children, so these need --jobs 1
+PROCESS_ALGORITHMS = ['parallelBranchAndBound']
+
+# Proj5GUI's data_range with SCALE = 1.0
+X_RANGE = (-1.5, 1.5)
+Y_RANGE = (-1.0, 1.0)
+
+RESULT_FIELDS = ['cost', 'time', 'count', 'max', 'total', 'pruned']
+JOB_FIELDS = ['algorithm', 'size', 'seed', 'difficulty', 'timeLimit']
+
+
+# Same random draws, in the same order, as Proj5GUI.newPoints followed by
+# the Scenario constructor (which draws elevations from the same state)
+# Time complexity: O(N) plus Scenario construction
+# Space complexity: O(N)
+def generateScenario(size, seed, difficulty) -> Scenario:
+    random.seed(seed)
+    xs = []
+    ys = []
+    while len(xs) < size:
+        x = random.uniform(0.0, 1.0)
+        y = random.uniform(0.0, 1.0)
+        xs.append(X_RANGE[0] + (X_RANGE[1] - X_RANGE[0]) * x)
+        ys.append(Y_RANGE[0] + (Y_RANGE[1] - Y_RANGE[0]) * y)
+    return Scenario.fromArrays(xs, ys, difficulty, seed)
+
+
+# Runs one job dict (JOB_FIELDS) and returns it with the result fields
+# added. Solver progress prints go to stderr so stdout output stays clean.
+def runJob(job):
+    scenario = generateScenario(job['size'], job['seed'], job['difficulty'])
+    solver = TSPSolver(None)
+    solver.setupWithScenario(scenario)
+    with contextlib.redirect_stdout(sys.stderr):
+        results = getattr(solver, job['algorithm'])(time_allowance=job['timeLimit'])
+
+    row = dict(job)
+    for field in RESULT_FIELDS:
+        value = results.get(field)
+        row[field] = value.item() if isinstance(value, numpy.generic) else value
+    return row
+
+
+def createJobs(algorithms, sizes, seeds, difficulties, timeLimit):
+    return [{'algorithm': algorithm, 'size': size, 'seed': seed, 'difficulty': difficulty,
+             'timeLimit': timeLimit}
+            for algorithm, difficulty, size, seed in itertools.product(algorithms, difficulties, sizes, seeds)]
+
+
+# Rows come back in job order whatever the job count
+def runJobs(jobs, jobCount=1):
+    if jobCount <= 1:
+        return [runJob(job) for job in jobs]
+
+    with Pool(jobCount) as pool:
+        return pool.map(runJob, jobs, chunksize=1)
+
+
+def writeRows(rows, output, outputFormat):
+    stream = sys.stdout if output is None else open(output, 'w', newline='')
+    try:
+        if outputFormat == 'json':
+            json.dump(rows, stream, indent=2)
+            stream.write('\n')
+        else:
+            writer = csv.DictWriter(stream, fieldnames=JOB_FIELDS + RESULT_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    finally:
+        if output is not None:
+            stream.close()
+
+
+def parseArguments(arguments):
+    parser = argparse.ArgumentParser(description='Run TSP solvers without the GUI.')
+    parser.add_argument('--algorithms', nargs='+', default=['greedy'], choices=ALGORITHMS,
+                        help='TSPSolver entry points')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[15])
+    parser.add_argument('--seeds', nargs='+', type=int, default=[20])
+    parser.add_argument('--difficulties', nargs='+', default=['Hard'], choices=DIFFICULTIES)
+    parser.add_argument('--time', type=float, default=60.0, help='time limit per run in seconds')
+    parser.add_argument('--jobs', type=int, default=1, help='runs in parallel')
+    parser.add_argument('--output', help='output file, stdout if omitted')
+    parser.add_argument('--format', choices=['csv', 'json'],
+                        help='defaults to the output file extension, else csv')
+    parsed = parser.parse_args(arguments)
+
+    if parsed.jobs > 1:
+        for algorithm in parsed.algorithms:
+            if algorithm in PROCESS_ALGORITHMS:
+                parser.error('{} starts its own processes and needs --jobs 1'.format(algorithm))
+    if parsed.format is None:
+        parsed.format = 'json' if parsed.output is not None and parsed.output.endswith('.json') else 'csv'
+    return parsed
+
+
+def main(arguments=None):
+    parsed = parseArguments(arguments)
+    jobs = createJobs(parsed.algorithms, parsed.sizes, parsed.seeds, parsed.difficulties, parsed.time)
+    writeRows(runJobs(jobs, parsed.jobs), parsed.output, parsed.format)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+from BaseSolver import BaseSolver
+from GreedySolver import GreedySolver
+import math
+import numpy
+
+
+class HeldKarpSolver(BaseSolver):
+    # The DP table is 2^(N-1) * (N-1) floats, about 80MB at 20 cities
+    MAX_CITIES = 20
+
+    # TSPSolver.branchAndBound hands scenarios this small to Held-Karp
+    HANDOFF_CITIES = 18
+
+    def __init__(self, tspSolver, maxTime):
+        super().__init__(tspSolver, maxTime)
+        self._results['optimal'] = False
+
+    # Bitmask dynamic program over the cost matrix, with city 0 as the
+    # fixed start. best[mask, j] is the cheapest path from city 0 through
+    # the cities in mask ending at city j + 1. Each layer of masks with the
+    # same popcount is extended one city at a time as whole-array operations.
+    # INF edges propagate as INF, so Hard mode needs no special handling.
+    # Time complexity: O(2^N * N^2)
+    # Space complexity: O(2^N * N)
+    def run(self):
+        greedySolver = GreedySolver(self.getTSPSolver(), self.getMaxTime())
+        greedySolver.solve()
+        self.setBSSF(greedySolver.getBSSF())
+        if self.getCityCount() < 2 or self.getCityCount() > self.MAX_CITIES or self.exceededMaxTime():
+            return
+
+        costs = self.getCostMatrix()
+        count = self.getCityCount() - 1
+        maskCount = 1 << count
+        masks = numpy.arange(maskCount)
+
+        best = numpy.full((maskCount, count), math.inf)
+        parent = numpy.full((maskCount, count), -1, dtype=numpy.int8)
+        best[1 << masks[:count], masks[:count]] = costs[0, 1:]
+        self.incrementTotal(count)
+
+        popcounts = numpy.zeros(maskCount, dtype=numpy.int8)
+        for bit in range(count):
+            popcounts += (masks >> bit) & 1
+
+        between = costs[1:, 1:]
+        for size in range(1, count):
+            if self.exceededMaxTime():
+                return
+
+            layer = masks[popcounts == size]
+            layerBest = best[layer]
+            for city in range(count):
+                extendable = layer[(layer >> city) & 1 == 0]
+                candidates = layerBest[(layer >> city) & 1 == 0] + between[:, city]
+                previous = candidates.argmin(axis=1)
+
+                targets = extendable | (1 << city)
+                best[targets, city] = candidates[numpy.arange(len(previous)), previous]
+                parent[targets, city] = previous
+                self.incrementTotal(len(targets))
+
+        fullMask = maskCount - 1
+        closed = best[fullMask] + costs[1:, 0]
+        last = int(closed.argmin())
+        if closed[last] == math.inf or closed[last] >= self.getBSSFCost():
+            self._results['optimal'] = True
+            return
+
+        path = []
+        mask = fullMask
+        while last >= 0:
+            path.append(last + 1)
+            previous = int(parent[mask, last])
+            mask ^= 1 << last
+            last = previous
+        path.append(0)
+        path.reverse()
+
+        self.setBSSFFromIndices(path)
+        self.incrementSolutionCount()
+        self._results['optimal'] = True
@@ -0,0 +1,86 @@
+# Tour stored as successor/predecessor arrays indexed by city, so a segment
+# can be cut out and spliced back in anywhere in O(1) link updates. Each
+# city also carries an order label that increases along the tour from
+# head, with gaps left between labels; between() answers "is x on the
+# path from a to b" in O(1) and only the moved cities are relabeled.
+class LinkedTour:
+    LABEL_GAP = 1 << 20
+
+    def __init__(self, order):
+        super().__init__()
+
+        cityCount = len(order)
+        self.succ = [0] * cityCount
+        self.pred = [0] * cityCount
+        self.labels = [0] * cityCount
+        for position, city in enumerate(order):
+            self.succ[city] = order[(position + 1) % cityCount]
+            self.pred[city] = order[position - 1]
+        self.head = order[0]
+        self.relabel()
+
+    def __len__(self):
+        return len(self.succ)
+
+    # Time complexity: O(N)
+    # Space complexity: O(1)
+    def relabel(self):
+        city = self.head
+        for position in range(len(self.succ)):
+            self.labels[city] = position * self.LABEL_GAP
+            city = self.succ[city]
+
+    # True when x lies on the forward path from a to b, both inclusive
+    # Time complexity: O(1)
+    # Space complexity: O(1)
+    def between(self, a, x, b) -> bool:
+        labelA, labelX, labelB = self.labels[a], self.labels[x], self.labels[b]
+        if labelA <= labelB:
+            return labelA <= labelX <= labelB
+        return labelX >= labelA or labelX <= labelB
+
+    # Moves the segment first..last (kept in the same direction) between c
+    # and succ(c). c must not be in the segment or directly before it.
+    # Time complexity: O(1) links, O(L) labels, O(N) on rare full relabels
+    # Space complexity: O(L)
+    def moveSegment(self, first, last, c):
+        before, after = self.pred[first], self.succ[last]
+        if self.between(first, self.head, last):
+            self.head = after
+
+        self.succ[before] = after
+        self.pred[after] = before
+
+        d = self.succ[c]
+        self.succ[c] = first
+        self.pred[first] = c
+        self.succ[last] = d
+        self.pred[d] = last
+
+        segment = []
+        city = first
+        while True:
+            segment.append(city)
+            if city == last:
+                break
+            city = self.succ[city]
+
+        lower = self.labels[c]
+        upper = self.labels[d] if d != self.head else lower + self.LABEL_GAP * (len(segment) + 1)
+        step = (upper - lower) // (len(segment) + 1)
+        if step == 0:
+            self.relabel()
+            return
+
+        for offset, city in enumerate(segment):
+            self.labels[city] = lower + step * (offset + 1)
+
+    # Time complexity: O(N)
+    # Space complexity: O(N)
+    def toOrder(self):
+        order = []
+        city = self.head
+        for _ in range(len(self.succ)):
+            order.append(city)
+            city = self.succ[city]
+        return order
@@ -0,0 +1,203 @@
+from BaseSolver import BaseSolver
+from GreedySolver import GreedySolver
+from OrOptEngine import OrOptEngine
+from collections import deque
+import math
+import numpy
+
+
+class LocalSearchSolver(BaseSolver):
+    # Candidate list length per city
+    NEIGHBOR_COUNT = 8
+
+    # Longest segment Or-opt moves
+    MAX_SEGMENT = 3
+
+    # Share of the time allowance the greedy start may use
+    GREEDY_TIME_FRACTION = 0.2
+
+    # Above this size the list-backed 2-opt phase is skipped: its O(N)
+    # move application and N^2 cost lists don't scale, the linked Or-3opt
+    # phase does
+    ARRAY_PHASE_MAX_CITIES = 2000
+
+    def __init__(self, tspSolver, maxTime):
+        super().__init__(tspSolver, maxTime)
+        self.tour = []
+        self.positions = []
+        self.twoOptMoves = 0
+        self.orOptMoves = 0
+        self.orThreeOptMoves = 0
+
+    # Improves the greedy tour with 2-opt and Or-opt moves until no city in
+    # the don't-look queue has an improving move. Only neighbor-list
+    # candidates are tried. Costs are asymmetric and may be INF, so 2-opt
+    # deltas use forward and backward prefix sums of the tour edges
+    # (finite part and INF count kept separately) instead of re-summing
+    # the reversed segment. Whatever time is left goes to the Or-3opt
+    # engine on a linked tour.
+    # Time complexity: O(N^2) for neighbor lists, then per move as below
+    # Space complexity: O(N * K)
+    def run(self):
+        greedySolver = GreedySolver(self.getTSPSolver(), self.getMaxTime() * self.GREEDY_TIME_FRACTION)
+        greedySolver.solve()
+        self.setBSSF(greedySolver.getBSSF())
+        self.incrementSolutionCount(greedySolver.getResults()['count'])
+        if self.getBSSF() is None or self.getBSSFCost() == math.inf or self.getCityCount() < 5:
+            return
+
+        costs = self.getCostMatrix()
+        self.outNeighbors, self.inNeighbors = self.buildNeighborLists(costs)
+        tour = self.getBSSF().getIndices().tolist()
+        if self.getCityCount() <= self.ARRAY_PHASE_MAX_CITIES:
+            tour = self.improveTwoOpt(costs, tour)
+
+        # Or-3opt finishing phase on the linked tour, O(1) per applied move
+        engine = OrOptEngine(costs, tour, self.outNeighbors, self.inNeighbors)
+        engine.improve(self.exceededMaxTime)
+        self.incrementTotal(engine.evaluated)
+        self.orThreeOptMoves = engine.moves
+
+        self._results['moves'] = {'twoOpt': self.twoOptMoves, 'orOpt': self.orOptMoves,
+                                  'orThreeOpt': self.orThreeOptMoves}
+        if self.twoOptMoves + self.orOptMoves + self.orThreeOptMoves > 0:
+            self.setBSSFFromIndices(engine.getOrder())
+            self.incrementSolutionCount()
+
+    # Time complexity: O(N * K) per pass to evaluate, O(N) per applied move
+    # Space complexity: O(N^2) for the cost lists
+    def improveTwoOpt(self, costs, tour):
+        self.costs = costs.tolist()
+        self.setTour(tour)
+
+        queue = deque(self.tour)
+        queued = [True] * self.getCityCount()
+        while queue and not self.exceededMaxTime():
+            city = queue.popleft()
+            queued[city] = False
+
+            touched = self.tryTwoOpt(city) or self.tryOrOpt(city)
+            if touched is None:
+                continue
+
+            for touchedCity in touched:
+                if not queued[touchedCity]:
+                    queued[touchedCity] = True
+                    queue.append(touchedCity)
+        return self.tour
+
+    # Nearest cities by outgoing cost (rows) and by incoming cost (columns)
+    # Time complexity: O(N^2)
+    # Space complexity: O(N * K)
+    def buildNeighborLists(self, costs):
+        count = min(self.NEIGHBOR_COUNT, self.getCityCount() - 1)
+        outNeighbors = numpy.argpartition(costs, count - 1, axis=1)[:, :count]
+        inNeighbors = numpy.argpartition(costs.T, count - 1, axis=1)[:, :count]
+
+        outNeighbors = numpy.take_along_axis(
+            outNeighbors, numpy.take_along_axis(costs, outNeighbors, axis=1).argsort(axis=1), axis=1)
+        inNeighbors = numpy.take_along_axis(
+            inNeighbors, numpy.take_along_axis(costs.T, inNeighbors, axis=1).argsort(axis=1), axis=1)
+        return outNeighbors.tolist(), inNeighbors.tolist()
+
+    # Installs a tour and rebuilds positions and the cyclic prefix sums.
+    # Prefix k covers tour edges 0..k-1, edge k being tour[k] -> tour[k + 1].
+    # Time complexity: O(N)
+    # Space complexity: O(N)
+    def setTour(self, tour):
+        self.tour = tour
+        self.positions = [0] * len(tour)
+        for position, city in enumerate(tour):
+            self.positions[city] = position
+
+        self.forward = [0.0]
+        self.forwardInf = [0]
+        self.backward = [0.0]
+        self.backwardInf = [0]
+        for position, city in enumerate(tour):
+            nextCity = tour[(position + 1) % len(tour)]
+            self.appendPrefix(self.forward, self.forwardInf, self.costs[city][nextCity])
+            self.appendPrefix(self.backward, self.backwardInf, self.costs[nextCity][city])
+
+    @staticmethod
+    def appendPrefix(sums, infCounts, cost):
+        if cost == math.inf:
+            sums.append(sums[-1])
+            infCounts.append(infCounts[-1] + 1)
+        else:
+            sums.append(sums[-1] + cost)
+            infCounts.append(infCounts[-1])
+
+    # Cost of tour edges start..end-1, wrapping around the tour
+    # Time complexity: O(1)
+    # Space complexity: O(1)
+    def rangeCost(self, sums, infCounts, start, end):
+        if start <= end:
+            infCount = infCounts[end] - infCounts[start]
+            cost = sums[end] - sums[start]
+        else:
+            infCount = infCounts[-1] - infCounts[start] + infCounts[end]
+            cost = sums[-1] - sums[start] + sums[end]
+        return math.inf if infCount > 0 else cost
+
+    # Replaces a -> b and c -> d with a -> c and b -> d, reversing b..c
+    # Time complexity: O(K) to evaluate, O(N) to apply
+    # Space complexity: O(N) to apply
+    def tryTwoOpt(self, a):
+        cityCount = self.getCityCount()
+        costs = self.costs
+        first = self.positions[a]
+        b = self.tour[(first + 1) % cityCount]
+        for c in self.outNeighbors[a]:
+            last = self.positions[c]
+            d = self.tour[(last + 1) % cityCount]
+            if c == b or d == a or c == a:
+                continue
+
+            self.incrementTotal()
+            segmentStart = (first + 1) % cityCount
+            delta = costs[a][c] + costs[b][d] - costs[a][b] - costs[c][d]
+            if delta == math.inf:
+                continue
+            delta += self.rangeCost(self.backward, self.backwardInf, segmentStart, last)
+            delta -= self.rangeCost(self.forward, self.forwardInf, segmentStart, last)
+            if delta < 0:
+                rotated = self.tour[segmentStart:] + self.tour[:segmentStart]
+                length = (last - segmentStart) % cityCount + 1
+                self.setTour(rotated[:length][::-1] + rotated[length:])
+                self.twoOptMoves += 1
+                return a, b, c, d
+        return None
+
+    # Moves the segment starting at a (1..MAX_SEGMENT cities, same
+    # direction) between a neighbor c and its successor d
+    # Time complexity: O(K * MAX_SEGMENT) to evaluate, O(N) to apply
+    # Space complexity: O(N) to apply
+    def tryOrOpt(self, a):
+        cityCount = self.getCityCount()
+        costs = self.costs
+        first = self.positions[a]
+        before = self.tour[first - 1]
+        for length in range(1, min(self.MAX_SEGMENT, cityCount - 3) + 1):
+            segment = [self.tour[(first + offset) % cityCount] for offset in range(length)]
+            end = segment[-1]
+            after = self.tour[(first + length) % cityCount]
+            if costs[before][after] == math.inf:
+                continue
+            removeGain = costs[before][a] + costs[end][after] - costs[before][after]
+
+            for c in self.inNeighbors[a]:
+                d = self.tour[(self.positions[c] + 1) % cityCount]
+                if c in segment or d in segment or c == before:
+                    continue
+
+                self.incrementTotal()
+                delta = costs[c][a] + costs[end][d] - costs[c][d] - removeGain
+                if delta < 0:
+                    rotated = self.tour[first:] + self.tour[:first]
+                    rest = rotated[length:]
+                    insertAt = rest.index(c) + 1
+                    self.setTour(rest[:insertAt] + segment + rest[insertAt:])
+                    self.orOptMoves += 1
+                    return before, after, a, end, c, d
+        return None
@@ -0,0 +1,252 @@
+from abc import abstractmethod
+import math
+import time
+import numpy
+
+
+# Extra lower bound on top of the reduced cost of a branch node. Bounds work
+# on the residual problem of the node's reduced matrix: leave the last city,
+# visit every unvisited city and return to the start. Merging the last city
+# and the start into node 0 turns that into a smaller ATSP whose tours cost
+# at least the value returned, so node bound = reduced cost + evaluate().
+class LowerBound:
+    name = None
+
+    # False when evaluate() adds nothing, so nodes never need bounding
+    residual = True
+
+    def __init__(self):
+        super().__init__()
+
+        self.calls = 0
+        self.time = 0.0
+
+    # Time complexity: see subclasses
+    # Space complexity: O(N^2) for the residual matrix
+    def evaluate(self, matrix, path) -> float:
+        startTime = time.time()
+        value = self.computeBound(residualMatrix(matrix, path))
+        self.time += time.time() - startTime
+        self.calls += 1
+        return value
+
+    @abstractmethod
+    def computeBound(self, residual) -> float:
+        pass
+
+    def getStats(self):
+        return {'name': self.name, 'calls': self.calls, 'time': self.time}
+
+
+# Time complexity: O(N^2)
+# Space complexity: O(N^2)
+def residualMatrix(matrix, path):
+    unvisited = numpy.ones(matrix.get_row_count(), dtype=bool)
+    unvisited[path] = False
+    cities = numpy.flatnonzero(unvisited)
+    startIndex, endIndex = path[0], path[-1]
+
+    residual = numpy.empty((len(cities) + 1, len(cities) + 1))
+    residual[1:, 1:] = matrix.values[numpy.ix_(cities, cities)]
+    residual[0, 1:] = matrix.values[endIndex, cities]
+    residual[1:, 0] = matrix.values[cities, startIndex]
+    residual[0, 0] = matrix.values[endIndex, startIndex] if len(cities) == 0 else math.inf
+    return residual
+
+
+# The reduced cost on its own, as before
+class ReducedCostBound(LowerBound):
+    name = 'reduced'
+    residual = False
+
+    def evaluate(self, matrix, path) -> float:
+        return 0.0
+
+    def computeBound(self, residual) -> float:
+        return 0.0
+
+
+# Assignment problem relaxation (every city has one successor, subtours
+# allowed), solved with the Hungarian shortest augmenting path algorithm
+class AssignmentBound(LowerBound):
+    name = 'assignment'
+
+    # Time complexity: O(N^3), inner loops are array operations over columns
+    # Space complexity: O(N^2)
+    def computeBound(self, residual) -> float:
+        finite = residual[residual < math.inf]
+        if len(finite) == 0:
+            return math.inf
+
+        # INF edges become too expensive to ever be needed in a finite solution
+        size = residual.shape[0]
+        infCost = (finite.max() + 1.0) * (size + 1)
+        costs = numpy.where(residual < math.inf, residual, infCost)
+
+        rowPotential = numpy.zeros(size + 1)
+        colPotential = numpy.zeros(size + 1)
+        rowOfCol = numpy.zeros(size + 1, dtype=int)
+        way = numpy.zeros(size + 1, dtype=int)
+        for row in range(1, size + 1):
+            rowOfCol[0] = row
+            col = 0
+            minSlack = numpy.full(size + 1, math.inf)
+            used = numpy.zeros(size + 1, dtype=bool)
+            while True:
+                used[col] = True
+                currentRow = rowOfCol[col]
+                slack = costs[currentRow - 1] - rowPotential[currentRow] - colPotential[1:]
+
+                free = ~used[1:]
+                better = free & (slack < minSlack[1:])
+                minSlack[1:][better] = slack[better]
+                way[1:][better] = col
+
+                freeSlack = numpy.where(free, minSlack[1:], math.inf)
+                nextCol = int(freeSlack.argmin()) + 1
+                delta = freeSlack[nextCol - 1]
+
+                rowPotential[rowOfCol[used]] += delta
+                colPotential[used] -= delta
+                minSlack[~used] -= delta
+                col = nextCol
+                if rowOfCol[col] == 0:
+                    break
+
+            while col:
+                previousCol = way[col]
+                rowOfCol[col] = rowOfCol[previousCol]
+                col = previousCol
+
+        value = -colPotential[0]
+        return math.inf if value >= infCost else value
+
+
+# Lagrangian relaxation of the out-degree constraints over 1-arborescences
+# (a spanning arborescence from node 0 plus the cheapest edge back into it).
+# Subgradient steps on the node penalties tighten the bound; every
+# iteration's value is valid, the best one is returned.
+class ArborescenceBound(LowerBound):
+    name = 'arborescence'
+
+    def __init__(self, iterations=15):
+        super().__init__()
+        self.iterations = iterations
+
+    # Time complexity: O(iterations * N^3) worst case, O(iterations * N^2) typical
+    # Space complexity: O(N^2)
+    def computeBound(self, residual) -> float:
+        size = residual.shape[0]
+        if size == 1:
+            return residual[0, 0]
+
+        penalties = numpy.zeros(size)
+        bestValue = -math.inf
+        stepScale = 2.0
+        for _ in range(self.iterations):
+            weights = residual + penalties[:, numpy.newaxis]
+            treeWeights = weights.copy()
+            treeWeights[:, 0] = math.inf
+
+            parents = minimumArborescence(treeWeights, 0)
+            rootParent = int(weights[:, 0].argmin())
+            if parents is None or weights[rootParent, 0] == math.inf:
+                return math.inf
+
+            nodes = numpy.arange(1, size)
+            value = weights[parents[1:], nodes].sum() + weights[rootParent, 0] - penalties.sum()
+            if value > bestValue:
+                bestValue = value
+            else:
+                stepScale /= 2.0
+
+            outDegree = numpy.bincount(parents[1:], minlength=size)
+            outDegree[rootParent] += 1
+            subgradient = outDegree - 1
+            norm = numpy.dot(subgradient, subgradient)
+            if norm == 0:
+                break   # the 1-arborescence is a tour, the bound is exact
+
+            step = stepScale * (0.01 * abs(value) + 1.0) / norm
+            penalties += step * subgradient
+
+        # Tour costs are integers, so the bound can be rounded up
+        return max(0.0, math.ceil(bestValue - 1e-6))
+
+
+# Chu-Liu/Edmonds minimum spanning arborescence rooted at root. Returns the
+# parent of every node (-1 for the root) or None when some node cannot be
+# reached. weights[:, root] and the diagonal must be INF.
+# Time complexity: O(N^3) worst case, one O(N^2) pass per contracted cycle
+# Space complexity: O(N^2)
+def minimumArborescence(weights, root):
+    size = weights.shape[0]
+    parents = weights.argmin(axis=0)
+    minIncoming = weights[parents, numpy.arange(size)]
+    minIncoming[root] = 0.0
+    if numpy.isinf(minIncoming).any():
+        return None
+    parents[root] = -1
+
+    cycle = findCycle(parents)
+    if cycle is None:
+        return parents
+
+    inCycle = numpy.zeros(size, dtype=bool)
+    inCycle[cycle] = True
+    others = numpy.flatnonzero(~inCycle)
+    cycleNode = len(others)
+
+    # Entering the cycle at v replaces v's cheapest incoming edge
+    entering = weights[numpy.ix_(others, cycle)] - minIncoming[cycle]
+    enterAt = entering.argmin(axis=1)
+    leaving = weights[numpy.ix_(cycle, others)]
+    leaveFrom = leaving.argmin(axis=0)
+
+    contracted = numpy.full((cycleNode + 1, cycleNode + 1), math.inf)
+    contracted[:cycleNode, :cycleNode] = weights[numpy.ix_(others, others)]
+    contracted[:cycleNode, cycleNode] = entering[numpy.arange(cycleNode), enterAt]
+    contracted[cycleNode, :cycleNode] = leaving[leaveFrom, numpy.arange(cycleNode)]
+
+    contractedRoot = int(numpy.searchsorted(others, root))
+    contractedParents = minimumArborescence(contracted, contractedRoot)
+    if contractedParents is None:
+        return None
+
+    for index, node in enumerate(others):
+        parent = contractedParents[index]
+        if parent == cycleNode:
+            parents[node] = cycle[leaveFrom[index]]
+        elif parent >= 0:
+            parents[node] = others[parent]
+
+    enteredFrom = contractedParents[cycleNode]
+    parents[cycle[enterAt[enteredFrom]]] = others[enteredFrom]
+    return parents
+
+
+# Time complexity: O(N)
+# Space complexity: O(N)
+def findCycle(parents):
+    state = numpy.zeros(len(parents), dtype=numpy.int8)   # 0 new, 1 on walk, 2 done
+    for start in range(len(parents)):
+        walk = []
+        node = start
+        while node >= 0 and state[node] == 0:
+            state[node] = 1
+            walk.append(node)
+            node = parents[node]
+
+        if node >= 0 and state[node] == 1:
+            return walk[walk.index(node):]
+        state[walk] = 2
+    return None
+
+
+BOUNDS = {bound.name: bound for bound in (ReducedCostBound, AssignmentBound, ArborescenceBound)}
+
+
+def createLowerBound(name) -> LowerBound:
+    if name not in BOUNDS:
+        raise ValueError('Unknown lower bound: {}'.format(name))
+    return BOUNDS[name]()
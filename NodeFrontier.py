@@ -0,0 +1,85 @@
+import heapq
+import itertools
+
+
+# Single-threaded priority queue of branch nodes built on heapq. Entries
+# are (key, counter, node) so equal keys pop in insertion order and nodes
+# never need to be compared. When the frontier reaches capacity the
+# worst-keyed entries are evicted instead of rejecting the new node.
+class NodeFrontier:
+    def __init__(self, capacity, keepFraction=0.9):
+        super().__init__()
+
+        self.heap = []
+        self.counter = itertools.count()
+        self.capacity = capacity
+        self.keepCount = max(1, int(capacity * keepFraction))
+
+        self.pushes = 0
+        self.pops = 0
+        self.evicted = 0
+        self.evictionRounds = 0
+        self.peak = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def empty(self) -> bool:
+        return not self.heap
+
+    # Returns the number of nodes evicted to make room
+    # Time complexity: O(log q), amortized O(log q) with evictions
+    # Space complexity: O(1)
+    def push(self, key, node) -> int:
+        heapq.heappush(self.heap, (key, next(self.counter), node))
+        self.pushes += 1
+        self.peak = max(self.peak, len(self.heap))
+
+        if len(self.heap) > self.capacity:
+            return self.evictWorst()
+        return 0
+
+    # Time complexity: O(log q)
+    # Space complexity: O(1)
+    def pop(self):
+        self.pops += 1
+        return heapq.heappop(self.heap)[2]
+
+    def peekKey(self):
+        return self.heap[0][0]
+
+    # Nodes in pop order, e.g. to checkpoint the frontier
+    # Time complexity: O(q log q)
+    # Space complexity: O(q)
+    def getNodes(self):
+        return [node for _, _, node in sorted(self.heap)]
+
+    # Recomputes every key, e.g. when the search strategy changes
+    # Time complexity: O(q)
+    # Space complexity: O(q)
+    def rekey(self, keyFunction):
+        self.heap = [(keyFunction(node), counter, node) for _, counter, node in self.heap]
+        heapq.heapify(self.heap)
+
+    # Keeps only the best keepCount entries; a sorted list is a valid heap
+    # Time complexity: O(q log q), once every (capacity - keepCount) pushes
+    # Space complexity: O(q)
+    def evictWorst(self) -> int:
+        before = len(self.heap)
+        self.heap = heapq.nsmallest(self.keepCount, self.heap)
+        dropped = before - len(self.heap)
+
+        self.evicted += dropped
+        self.evictionRounds += 1
+        return dropped
+
+    def getStats(self):
+        return {
+            'capacity': self.capacity,
+            'size': len(self.heap),
+            'peak': self.peak,
+            'pushes': self.pushes,
+            'pops': self.pops,
+            'evicted': self.evicted,
+            'evictionRounds': self.evictionRounds,
+        }
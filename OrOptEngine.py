@@ -0,0 +1,79 @@
+from LinkedTour import LinkedTour
+import math
+
+
+# Or-3opt improvement on a LinkedTour: a segment of up to MAX_SEGMENT
+# cities is cut out (p -> first, last -> n) and reinserted between c and
+# d = succ(c), never reversed, so asymmetric costs along the segment stay
+# the same. A move replaces p -> first, last -> n, c -> d with p -> n,
+# c -> first, last -> d, and every delta is six lookups. Candidate c/d
+# come from neighbor lists; a don't-look queue holds cities whose
+# neighborhood changed.
+class OrOptEngine:
+    MAX_SEGMENT = 3
+
+    def __init__(self, costMatrix, order, outNeighbors, inNeighbors):
+        super().__init__()
+
+        self.cost = costMatrix.item
+        self.tour = LinkedTour(order)
+        self.outNeighbors = outNeighbors
+        self.inNeighbors = inNeighbors
+        self.evaluated = 0
+        self.moves = 0
+
+    # Runs until no queued city has an improving move or stop() is True
+    # Time complexity: O(K * MAX_SEGMENT) per queued city, O(1) per move
+    # Space complexity: O(N)
+    def improve(self, stop):
+        queue = list(reversed(self.tour.toOrder()))
+        queued = [True] * len(self.tour)
+        while queue and not stop():
+            city = queue.pop()
+            queued[city] = False
+
+            touched = self.tryMoves(city)
+            if touched is None:
+                continue
+
+            for touchedCity in touched:
+                if not queued[touchedCity]:
+                    queued[touchedCity] = True
+                    queue.append(touchedCity)
+
+    # Time complexity: O(K * MAX_SEGMENT)
+    # Space complexity: O(1)
+    def tryMoves(self, first):
+        cost = self.cost
+        succ, pred = self.tour.succ, self.tour.pred
+        before = pred[first]
+
+        last = first
+        for length in range(1, min(self.MAX_SEGMENT, len(self.tour) - 3) + 1):
+            if length > 1:
+                last = succ[last]
+            after = succ[last]
+            if after == before:
+                break
+
+            bridge = cost(before, after)
+            if bridge == math.inf:
+                continue
+            removeGain = cost(before, first) + cost(last, after) - bridge
+
+            # c from cheap edges into first, d from cheap edges out of last
+            candidates = [(c, succ[c]) for c in self.inNeighbors[first]]
+            candidates += [(pred[d], d) for d in self.outNeighbors[last]]
+            for c, d in candidates:
+                if c == before or self.tour.between(first, c, last):
+                    continue
+
+                self.evaluated += 1
+                if cost(c, first) + cost(last, d) - cost(c, d) < removeGain:
+                    self.tour.moveSegment(first, last, c)
+                    self.moves += 1
+                    return before, after, first, last, c, d
+        return None
+
+    def getOrder(self):
+        return self.tour.toOrder()
@@ -0,0 +1,177 @@
+from BranchAndBoundSolver import BranchAndBoundSolver
+from BaseSolver import BaseSolver
+from GreedySolver import GreedySolver
+import multiprocessing
+import math
+import os
+import time
+
+
+# Per-process state installed by the pool initializer
+_worker = {}
+
+
+def _initWorker(tspSolver, incumbent, incumbentLock, stopFlag, maxNodes, strategy, bound):
+    _worker['tspSolver'] = tspSolver
+    _worker['incumbent'] = incumbent
+    _worker['incumbentLock'] = incumbentLock
+    _worker['stopFlag'] = stopFlag
+    _worker['maxNodes'] = maxNodes
+    _worker['strategy'] = strategy
+    _worker['bound'] = bound
+
+
+def _solveSubtree(task):
+    rootNode, startIndex, deadline = task
+    solver = SubtreeBranchAndBoundSolver(_worker['tspSolver'], _worker['maxNodes'],
+                                         deadline - time.time(), _worker['strategy'], _worker['bound'])
+    return solver.solveSubtree(rootNode, startIndex)
+
+
+# Runs the normal best-first search on one subtree, pruning against the
+# incumbent cost shared by every worker through shared memory
+class SubtreeBranchAndBoundSolver(BranchAndBoundSolver):
+    def __init__(self, tspSolver, maxNodes, maxTime, strategy, bound):
+        super().__init__(tspSolver, maxNodes, maxTime, strategy, bound=bound)
+
+    def solveSubtree(self, rootNode, startIndex):
+        self._startTime = time.time()
+        if rootNode.get_cost() < self.getBSSFCost():
+            self.nodeQueue.push(self.getNodeKey(rootNode), rootNode)
+        else:
+            self.incrementPruned()
+
+        self.search(startIndex)
+
+        bssf = self.getBSSF()
+        return {
+            'pid': os.getpid(),
+            'cost': bssf.cost if bssf is not None else math.inf,
+            'route': None if bssf is None else bssf.getIndices(),
+            'count': self._intermediateCount,
+            'max': self.getMaxConcurrentNodes(),
+            'total': self._total,
+            'pruned': self._pruned,
+            'dominated': self.dominated,
+            'boundStats': self.lowerBound.getStats(),
+        }
+
+    def getBSSFCost(self) -> float:
+        return min(super().getBSSFCost(), _worker['incumbent'].value)
+
+    # Publishes every local improvement so other workers prune against it
+    def setBSSF(self, value):
+        super().setBSSF(value)
+        if value is None:
+            return
+
+        with _worker['incumbentLock']:
+            if value.cost < _worker['incumbent'].value:
+                _worker['incumbent'].value = value.cost
+
+    def exceededMaxTime(self):
+        return _worker['stopFlag'].value or super().exceededMaxTime()
+
+
+class ParallelBranchAndBoundSolver(BaseSolver):
+    # Aim for this many subtrees per worker so idle workers can keep
+    # pulling work while others are stuck in large subtrees
+    TASKS_PER_WORKER = 8
+
+    def __init__(self, tspSolver, maxNodes, maxTime, workerCount=None, strategy='costPerDepth',
+                 bound='reduced'):
+        super().__init__(tspSolver, maxTime)
+        self.maxNodes = maxNodes
+        self.workerCount = workerCount or os.cpu_count() or 1
+        self.strategy = strategy
+        self.bound = bound
+        self.setMaxConcurrentNodes(0)
+        self._results['strategy'] = strategy
+        self._results['bound'] = bound
+        self._results['dominated'] = 0
+        self._results['boundStats'] = {'name': bound, 'calls': 0, 'time': 0.0}
+        self._results['workers'] = self.workerCount
+
+    # Splits the tree near the root into subtrees and hands them to a pool
+    # of worker processes, best bound first. Workers pull the next subtree
+    # as soon as they finish one and share the incumbent cost.
+    # Time complexity: O(N! * N^2 / workers) ideally
+    # Space complexity: O(workers * (q * N + N^2))
+    def run(self):
+        greedySolver = GreedySolver(self.getTSPSolver(), self.getMaxTime())
+        greedySolver.solve()
+        self.setBSSF(greedySolver.getBSSF())
+        if self.exceededMaxTime():
+            return
+
+        rootSolver = BranchAndBoundSolver(self.getTSPSolver(), self.maxNodes, self.getMaxTime(),
+                                          self.strategy, bound=self.bound)
+        self.lowerBound = rootSolver.lowerBound
+        startIndex, rootNode = rootSolver.createRootNode()
+        self.incrementTotal()
+        tasks = self.splitSubtrees(rootNode)
+        if not tasks:
+            return
+
+        context = multiprocessing.get_context()
+        incumbent = context.RawValue('d', self.getBSSFCost())
+        incumbentLock = context.Lock()
+        stopFlag = context.RawValue('b', 0)
+        deadline = self._startTime + self.getMaxTime()
+
+        # Workers only see the shared stop flag, so cancelling sets it
+        def stopWorkers():
+            stopFlag.value = 1
+
+        workerMax = {}
+        initArgs = (self.getTSPSolver(), incumbent, incumbentLock, stopFlag,
+                    max(1, self.maxNodes // self.workerCount), self.strategy, self.bound)
+        self.getTSPSolver().addCancelListener(stopWorkers)
+        if self.getTSPSolver().isCancelled():
+            stopWorkers()
+        try:
+            with context.Pool(self.workerCount, _initWorker, initArgs) as pool:
+                taskArgs = [(node, startIndex, deadline) for node in tasks]
+                for result in pool.imap_unordered(_solveSubtree, taskArgs):
+                    if self.exceededMaxTime():
+                        stopFlag.value = 1
+
+                    self.incrementTotal(result['total'])
+                    self.incrementPruned(result['pruned'])
+                    self.incrementSolutionCount(result['count'])
+                    self._results['dominated'] += result['dominated']
+                    self._results['boundStats']['calls'] += result['boundStats']['calls']
+                    self._results['boundStats']['time'] += result['boundStats']['time']
+                    workerMax[result['pid']] = max(workerMax.get(result['pid'], 0), result['max'])
+                    if result['cost'] < self.getBSSFCost():
+                        self.setBSSFFromIndices(result['route'])
+        finally:
+            self.getTSPSolver().removeCancelListener(stopWorkers)
+
+        self.setMaxConcurrentNodes(sum(workerMax.values()))
+        print('Final (time: {0:.3f})'.format(self.getClampedTime()))
+
+    # Expands the shallowest levels until there are enough subtrees
+    # Time complexity: O(tasks * N^3)
+    # Space complexity: O(tasks * N)
+    def splitSubtrees(self, rootNode):
+        if rootNode.get_cost() >= self.getBSSFCost():
+            self.incrementPruned()
+            return []
+
+        targetCount = self.workerCount * self.TASKS_PER_WORKER
+        tasks = [rootNode]
+        while tasks and len(tasks) < targetCount and tasks[0].get_depth() < self.getCityCount() - 1:
+            children = []
+            for node in tasks:
+                nodeChildren = node.generate_child_nodes(self.getScenario())
+                self.incrementTotal(len(nodeChildren))
+                for child in nodeChildren:
+                    if child.get_cost() < self.getBSSFCost():
+                        children.append(child)
+                    else:
+                        self.incrementPruned()
+            tasks = children
+
+        tasks.sort(key=lambda node: node.get_cost())
+        return tasks
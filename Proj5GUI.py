@@ -192,8 +192,35 @@ class PointLineView( QWidget ):
 
 
 
+# Runs one TSPSolver entry point off the UI thread.  Every improved BSSF is
+# sent through bssfFound as the solver finds it, the results through solved.
+class SolverWorker( QThread ):
+	bssfFound = pyqtSignal( object )
+	solved = pyqtSignal( object )
+
+	def __init__( self, solver, method, max_time ):
+		super(SolverWorker,self).__init__()
+		self.solver = solver
+		self.method = method
+		self.max_time = max_time
+
+	def run( self ):
+		results = None
+		listener = self.bssfFound.emit
+		self.solver.addBSSFListener( listener )
+		try:
+			results = getattr( self.solver, self.method )( time_allowance=self.max_time )
+		finally:
+			self.solver.removeBSSFListener( listener )
+			self.solved.emit( results )
+
+
+
 class Proj5GUI( QMainWindow ):
 
+	# Minimum seconds between live redraws of improving tours
+	REDRAW_INTERVAL = 0.1
+
 	def __init__( self ):
 		super(Proj5GUI,self).__init__()
 
@@ -202,6 +229,9 @@ class Proj5GUI( QMainWindow ):
 		self._MAX_SEED = 1000 
 
 		self._scenario = None
+		self._solving = False
+		self._lastRedraw = 0.0
+		self.worker = None
 		self.initUI()
 		self.solver = TSPSolver( self.view )
 		self.genParams = {'size':None,'seed':None,'diff':None}
@@ -264,7 +294,7 @@ class Proj5GUI( QMainWindow ):
 		self.view.repaint()
 
 
-	def displaySolution( self ) :						# what about calling this somehow every time a new bssf is found?
+	def displaySolution( self ) :						# also called for each BSSF streamed from the solver
 		self.view.clearEdges([(64,64,255)])				# get rid of edge labels but not point labels
 		if self._solution:
 			self.addCities()
@@ -289,9 +319,9 @@ class Proj5GUI( QMainWindow ):
 
 	def solveClicked(self):								# need to reset display??? and say "processing..." at bottom???
 		self.solver.setupWithScenario(self._scenario)
+		self.solver.clearCancel()
 
 		max_time = float( self.timeLimit.text() )
-		# TODO - start on a separate thread
 		self.view.clearEdges([(64,64,255)])				# get rid of edge labels but not point labels
 		self.numSolutions.setText( '--' )
 		self.tourCost.setText( '--' )
@@ -300,12 +330,25 @@ class Proj5GUI( QMainWindow ):
 		self.totalStates.setText( '--' )
 		self.prunedStates.setText( '--' )
 		self.statusBar.showMessage('Processing...')
-		#self.view.repaint()
-		#app.processEvents()
-		solve_func = 'self.solver.'+self.ALGORITHMS[self.algDropDown.currentIndex()][1]
-		results = eval(solve_func)(time_allowance=max_time )
+		self.setSolving( True )
+
+		# The solver runs on a worker thread so the window stays responsive
+		self.worker = SolverWorker( self.solver, self.ALGORITHMS[self.algDropDown.currentIndex()][1], max_time )
+		self.worker.bssfFound.connect( self.bssfFound )
+		self.worker.solved.connect( self.solveFinished )
+		self.worker.start()
+
+	def bssfFound( self, solution ):
+		self.tourCost.setText( '{}'.format(solution.cost) )
+		if time.time() - self._lastRedraw >= self.REDRAW_INTERVAL:
+			self._solution = solution
+			self.displaySolution()
+			self._lastRedraw = time.time()
+
+	def solveFinished( self, results ):
+		self.setSolving( False )
 		if results:
-			self.statusBar.showMessage('')
+			self.statusBar.showMessage('Cancelled.' if self.solver.isCancelled() else '')
 			self.numSolutions.setText( '{}'.format(results['count']) )
 			self.tourCost.setText( '{}'.format(results['cost']) )
 			self.solvedIn.setText( '{:6.6f} seconds'.format(results['time']) )
@@ -321,9 +364,33 @@ class Proj5GUI( QMainWindow ):
 		else:
 			print( 'GOT NULL SOLUTION BACK!!' )		#probably shouldn't ever use this...
 		self.view.repaint()
-#		app.processEvents()
+
+	# The solver stops at its next time check and returns its best tour so far
+	def cancelClicked( self ):
+		self.solver.cancel()
+		self.cancelButton.setEnabled(False)
+		self.statusBar.showMessage('Cancelling...')
+
+	def setSolving( self, solving ):
+		self._solving = solving
+		self._lastRedraw = 0.0
+		self.cancelButton.setEnabled(solving)
+		if solving:
+			self.solveButton.setEnabled(False)
+			self.generateButton.setEnabled(False)
+		else:
+			self.checkGenInputs()
+
+	def closeEvent( self, event ):
+		if self.worker is not None and self.worker.isRunning():
+			self.solver.cancel()
+			self.worker.wait()
+		event.accept()
 
 	def checkGenInputs(self):
+		if self._solving:
+			return
+
 		seed  = self.curSeed.text()
 		size = self.size.text()
 		diff = self.diffDropDown.currentText()
@@ -394,6 +461,7 @@ class Proj5GUI( QMainWindow ):
 		self.randSeedButton = QPushButton('Randomize Seed')
 		self.generateButton = QPushButton('Generate Scenario')
 		self.solveButton	= QPushButton('Solve TSP')
+		self.cancelButton	= QPushButton('Cancel')
 
 		self.curSeed		= QLineEdit('20')
 		self.curSeed.setFixedWidth(100)
@@ -462,6 +530,7 @@ class Proj5GUI( QMainWindow ):
 		h.addWidget( self.timeLimit )
 		h.addWidget( QLabel( 'seconds' ) )
 		h.addWidget( self.solveButton )
+		h.addWidget( self.cancelButton )
 		h.addStretch(1)
 		vbox.addLayout(h)
 
@@ -481,6 +550,7 @@ class Proj5GUI( QMainWindow ):
 
 		self.lastPath = (None,None)
 		self.solveButton.setEnabled(False)
+		self.cancelButton.setEnabled(False)
 
 		self.curSeed.textChanged.connect(self.checkGenInputs)
 		self.size.textChanged.connect(self.checkGenInputs)
@@ -488,6 +558,7 @@ class Proj5GUI( QMainWindow ):
 		self.randSeedButton.clicked.connect(self.randSeedClicked)
 		self.generateButton.clicked.connect(self.generateClicked)
 		self.solveButton.clicked.connect(self.solveClicked)
+		self.cancelButton.clicked.connect(self.cancelClicked)
 
 		self.diffDropDown.addItem('Easy                               ')					# Weird hack to make box wide enough to show all of last item
 		self.diffDropDown.addItem('Normal')
@@ -0,0 +1,43 @@
+import math
+import time
+import numpy
+
+
+# Draws random permutations in batches and scores a whole batch with one
+# gather-and-sum over the cost matrix. Returns the first valid tour in
+# sampling order along with its cost and the number of permutations tried
+# up to it. If time runs out first, returns the tour with the fewest INF
+# edges seen and the number of permutations tried in total. Batches
+# start small (most Easy/Normal draws are valid) and double up to
+# maxBatchCells rows * cities. stop() ending the run early (e.g. a
+# cancelled solve) counts as running out of time.
+# Time complexity: O(B * N log N) per batch
+# Space complexity: O(B * N)
+def sampleRandomTour(costMatrix, timeAllowance, maxBatchCells=1000000, stop=None):
+    cityCount = costMatrix.shape[0]
+    maxBatch = max(1, maxBatchCells // cityCount)
+    startTime = time.time()
+
+    bestTour = None
+    bestCost = math.inf
+    bestInfCount = cityCount + 1
+    count = 0
+    batchSize = 16
+    while bestTour is None or (time.time() - startTime < timeAllowance and not (stop is not None and stop())):
+        tours = numpy.random.random((batchSize, cityCount)).argsort(axis=1)
+        edges = costMatrix[tours, numpy.roll(tours, -1, axis=1)]
+        costs = edges.sum(axis=1)
+
+        valid = numpy.flatnonzero(costs < math.inf)
+        if len(valid) > 0:
+            first = valid[0]
+            return tours[first], costs[first], count + first + 1
+
+        infCounts = numpy.isinf(edges).sum(axis=1)
+        fewest = infCounts.argmin()
+        if infCounts[fewest] < bestInfCount:
+            bestTour, bestCost, bestInfCount = tours[fewest], costs[fewest], infCounts[fewest]
+        count += batchSize
+        batchSize = min(batchSize * 2, maxBatch)
+
+    return bestTour, bestCost, count
@@ -6,54 +6,106 @@ class ReducedCostMatrix:
     def __init__(self, scenario):
         super().__init__()
 
-        cities = scenario.getCities()
-        citiesLength = len(cities)
-
         self.cost = 0.0
-        self.length = citiesLength
-        self.values = numpy.empty((self.length, self.length))
+        self.values = numpy.array(scenario.getCostMatrix(), dtype=float)
+        self.length = self.values.shape[0]
+        self.rowReduction = numpy.zeros(self.length)
+        self.colReduction = numpy.zeros(self.length)
+        self.undoStack = None
+
+    # Rebuilds the matrix reached by a partial path from the original costs
+    # and the accumulated reductions, so callers only need to keep O(N) state
+    # Time complexity: O(N^2)
+    # Space complexity: O(N^2)
+    @staticmethod
+    def rebuild(scenario, path, cost, rowReduction, colReduction):
+        rcm = ReducedCostMatrix(scenario)
+        rcm.cost = cost
+        rcm.rowReduction[:] = rowReduction
+        rcm.colReduction[:] = colReduction
+        rcm.values -= rcm.rowReduction[:, numpy.newaxis]
+        rcm.values -= rcm.colReduction[numpy.newaxis, :]
+
+        # Same cells select() would have masked along the path
+        rcm.values[path[:-1], :] = math.inf
+        rcm.values[:, path[1:]] = math.inf
+        rcm.values[path[1:], path[:-1]] = math.inf
+        return rcm
 
-        for row in range(self.length):
-            for col in range(self.length):
-                self.values[row, col] = cities[row].costTo(cities[col])
+    # Time complexity: O(N^2)
+    # Space complexity: O(N^2)
+    def copy(self):
+        rcm = ReducedCostMatrix.__new__(ReducedCostMatrix)
+        rcm.cost = self.cost
+        rcm.values = self.values.copy()
+        rcm.length = self.length
+        rcm.rowReduction = self.rowReduction.copy()
+        rcm.colReduction = self.colReduction.copy()
+        rcm.undoStack = None
+        return rcm
+
+    # Starts recording what select() and reduce() change so the changes can
+    # be rolled back in place instead of copying the matrix
+    def enableUndo(self):
+        self.undoStack = []
+
+    def checkpoint(self) -> int:
+        return len(self.undoStack)
+
+    # Undoes every select/reduce made since the checkpoint, newest first
+    # Time complexity: O(N) per select, O(N^2) per reduce
+    # Space complexity: No additional space needed
+    def rollback(self, checkpoint):
+        while len(self.undoStack) > checkpoint:
+            record = self.undoStack.pop()
+            if record[0] == 'select':
+                _, rowIndex, columnIndex, row, column, cell, cost = record
+                self.values[:, columnIndex] = column
+                self.values[rowIndex, :] = row
+                self.values[columnIndex, rowIndex] = cell
+            else:
+                _, rowMins, colMins, cost = record
+                self.values += colMins[numpy.newaxis, :]
+                self.values += rowMins[:, numpy.newaxis]
+                self.rowReduction -= rowMins
+                self.colReduction -= colMins
+            self.cost = cost
 
     # Simply marks a city as visited and increments the cost
     # Time complexity: O(N)
     # Space complexity: No additional space needed
     def select(self, rowIndex, columnIndex):
+        if self.undoStack is not None:
+            self.undoStack.append(('select', rowIndex, columnIndex,
+                                   self.values[rowIndex, :].copy(),
+                                   self.values[:, columnIndex].copy(),
+                                   self.values[columnIndex, rowIndex], self.cost))
+
         self.cost += self.values[rowIndex, columnIndex]
         self.values[columnIndex, rowIndex] = math.inf
-        for i in range(self.length):
-            self.values[i, columnIndex] = math.inf
-            self.values[rowIndex, i] = math.inf
+        self.values[:, columnIndex] = math.inf
+        self.values[rowIndex, :] = math.inf
 
     # Performs row and column reductions and increments cost
-    # Time complexity: Two nested for loops, O(N^2)
-    # Space complexity: No additional space needed
+    # Rows or columns that are entirely INF are left untouched
+    # Time complexity: O(N^2) array operations
+    # Space complexity: O(N) for the minimum vectors
     def reduce(self):
-        for row in range(self.length):
-            minValue = math.inf
-            for column in range(self.length):
-                if self.values[row, column] < minValue:
-                    minValue = self.values[row, column]
-            if minValue == math.inf:
-                continue
-
-            self.cost += minValue
-            for column in range(self.length):
-                self.values[row, column] -= minValue
-
-        for column in range(self.length):
-            minValue = math.inf
-            for row in range(self.length):
-                if self.values[row, column] < minValue:
-                    minValue = self.values[row, column]
-            if minValue == math.inf:
-                continue
-
-            self.cost += minValue
-            for row in range(self.length):
-                self.values[row, column] -= minValue
+        oldCost = self.cost
+        rowMins = self.values.min(axis=1)
+        rowMins[rowMins == math.inf] = 0.0
+        self.cost += rowMins.sum()
+        self.rowReduction += rowMins
+        self.values -= rowMins[:, numpy.newaxis]
+
+        colMins = self.values.min(axis=0)
+        colMins[colMins == math.inf] = 0.0
+        self.cost += colMins.sum()
+        self.colReduction += colMins
+        self.values -= colMins[numpy.newaxis, :]
+
+        if self.undoStack is not None:
+            self.undoStack.append(('reduce', rowMins, colMins, oldCost))
 
     def get_cost(self) -> float:
         return self.cost
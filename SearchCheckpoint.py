@@ -0,0 +1,106 @@
+from BranchNode import BranchNode
+import hashlib
+import json
+import numpy
+import os
+import random
+import tempfile
+
+
+# Identifies the scenario a checkpoint belongs to
+def scenarioFingerprint(scenario) -> str:
+    return hashlib.sha1(scenario.getCostMatrix().tobytes()).hexdigest()
+
+
+# Branch-and-bound search state in one compressed .npz. Frontier nodes are
+# stored column-wise: their paths concatenated with per-node lengths, the
+# bounds and path costs as float arrays and the float reductions as
+# (nodes, N) matrices. The visited bitsets are rebuilt from the paths.
+# Everything scalar (counters, strategy state, Python and numpy RNG
+# state) goes into a JSON metadata string.
+class SearchCheckpoint:
+    VERSION = 1
+
+    def __init__(self, metadata, arrays):
+        super().__init__()
+        self.metadata = metadata
+        self.arrays = arrays
+
+    # Time complexity: O(q * N)
+    # Space complexity: O(q * N)
+    @staticmethod
+    def capture(scenario, nodes, bssfIndices, metadata):
+        cityCount = scenario.getCityCount()
+        numpyState = numpy.random.get_state()
+        metadata = dict(metadata, version=SearchCheckpoint.VERSION,
+                        fingerprint=scenarioFingerprint(scenario), cityCount=cityCount,
+                        pythonRandom=random.getstate(),
+                        numpyRandom=[int(numpyState[2]), int(numpyState[3]), float(numpyState[4])])
+
+        arrays = {
+            'pathLengths': numpy.array([node.get_depth() for node in nodes], dtype=numpy.int32),
+            'paths': numpy.concatenate([node.get_path() for node in nodes] or
+                                       [numpy.empty(0, dtype=numpy.int32)]).astype(numpy.int32),
+            'reducedCosts': numpy.array([node.reducedCost for node in nodes], dtype=float),
+            'costs': numpy.array([node.get_cost() for node in nodes], dtype=float),
+            'pathCosts': numpy.array([node.get_path_cost() for node in nodes], dtype=float),
+            'rowReductions': SearchCheckpoint.stackRows([node.rowReduction for node in nodes], cityCount),
+            'colReductions': SearchCheckpoint.stackRows([node.colReduction for node in nodes], cityCount),
+            'bssf': numpy.array([] if bssfIndices is None else bssfIndices, dtype=numpy.int32),
+            'numpyRandomKeys': numpyState[1],
+        }
+        return SearchCheckpoint(metadata, arrays)
+
+    @staticmethod
+    def stackRows(rows, cityCount):
+        if not rows:
+            return numpy.empty((0, cityCount))
+        return numpy.stack(rows).astype(float, copy=False)
+
+    # Writes to a temporary file next to path and renames it over path, so
+    # a crash mid-write leaves the previous checkpoint intact
+    def save(self, path):
+        directory = os.path.dirname(os.path.abspath(path))
+        descriptor, temporaryPath = tempfile.mkstemp(suffix='.npz', dir=directory)
+        try:
+            with os.fdopen(descriptor, 'wb') as stream:
+                numpy.savez_compressed(stream, metadata=numpy.array(json.dumps(self.metadata)), **self.arrays)
+            os.replace(temporaryPath, path)
+        except BaseException:
+            os.remove(temporaryPath)
+            raise
+
+    @staticmethod
+    def load(path):
+        with numpy.load(path) as data:
+            arrays = {name: data[name] for name in data.files if name != 'metadata'}
+            metadata = json.loads(str(data['metadata']))
+        if metadata.get('version') != SearchCheckpoint.VERSION:
+            raise ValueError('Unsupported checkpoint version: {}'.format(metadata.get('version')))
+        return SearchCheckpoint(metadata, arrays)
+
+    def checkScenario(self, scenario):
+        if self.metadata['fingerprint'] != scenarioFingerprint(scenario):
+            raise ValueError('Checkpoint was written for a different scenario')
+
+    # Frontier nodes in the order they were saved (pop order)
+    # Time complexity: O(q * N)
+    # Space complexity: O(q * N)
+    def getNodes(self):
+        arrays = self.arrays
+        if len(arrays['pathLengths']) == 0:
+            return []
+
+        paths = numpy.split(arrays['paths'], numpy.cumsum(arrays['pathLengths'])[:-1])
+        fields = zip(paths, arrays['reducedCosts'].tolist(), arrays['costs'].tolist(),
+                     arrays['rowReductions'], arrays['colReductions'], arrays['pathCosts'].tolist())
+        return [BranchNode.restore(*nodeFields) for nodeFields in fields]
+
+    def getBSSFIndices(self):
+        return self.arrays['bssf'] if len(self.arrays['bssf']) > 0 else None
+
+    def restoreRandomState(self):
+        version, internalState, gaussNext = self.metadata['pythonRandom']
+        random.setstate((version, tuple(internalState), gaussNext))
+        position, hasGauss, cachedGaussian = self.metadata['numpyRandom']
+        numpy.random.set_state(('MT19937', self.arrays['numpyRandomKeys'], position, hasGauss, cachedGaussian))
@@ -0,0 +1,78 @@
+from abc import abstractmethod
+
+
+# Decides the order in which BranchAndBoundSolver expands nodes. Smaller
+# keys are expanded first.
+class SearchStrategy:
+    name = None
+
+    @abstractmethod
+    def getKey(self, branchNode):
+        pass
+
+    # Called when a complete tour is popped from the frontier. Returns True
+    # when the strategy changed its keys and the frontier must be re-keyed.
+    def onLeaf(self) -> bool:
+        return False
+
+    # Mutable strategy state, saved with search checkpoints
+    def getState(self) -> dict:
+        return dict(vars(self))
+
+    def setState(self, state):
+        vars(self).update(state)
+
+
+# Original ordering: average bound per city on the path
+class CostPerDepthStrategy(SearchStrategy):
+    name = 'costPerDepth'
+
+    def getKey(self, branchNode):
+        return branchNode.get_cost() / branchNode.get_depth()
+
+
+# Pure best-first on the lower bound
+class BestBoundStrategy(SearchStrategy):
+    name = 'bestBound'
+
+    def getKey(self, branchNode):
+        return branchNode.get_cost()
+
+
+# Deepest node first, siblings ordered by bound
+class DepthFirstStrategy(SearchStrategy):
+    name = 'depthFirst'
+
+    def getKey(self, branchNode):
+        return -branchNode.get_depth(), branchNode.get_cost()
+
+
+# Dives depth-first until the first complete tour, then goes best-first
+class HybridStrategy(SearchStrategy):
+    name = 'hybrid'
+
+    def __init__(self):
+        super().__init__()
+        self.diving = True
+
+    def getKey(self, branchNode):
+        if self.diving:
+            return -branchNode.get_depth(), branchNode.get_cost()
+        return 0, branchNode.get_cost()
+
+    def onLeaf(self) -> bool:
+        if not self.diving:
+            return False
+
+        self.diving = False
+        return True
+
+
+STRATEGIES = {strategy.name: strategy for strategy in
+              (CostPerDepthStrategy, BestBoundStrategy, DepthFirstStrategy, HybridStrategy)}
+
+
+def createStrategy(name) -> SearchStrategy:
+    if name not in STRATEGIES:
+        raise ValueError('Unknown search strategy: {}'.format(name))
+    return STRATEGIES[name]()
@@ -0,0 +1,182 @@
+from BaseSolver import BaseSolver
+from CoolingSchedule import createSchedule
+from GreedySolver import GreedySolver
+from LinkedTour import LinkedTour
+import math
+import numpy
+
+
+class SimulatedAnnealingSolver(BaseSolver):
+    # Random moves scored per numpy batch
+    BATCH_SIZE = 4096
+
+    # Longest segment a move relocates
+    MAX_SEGMENT = 3
+
+    # Insertion points are drawn from this many nearest predecessors of the
+    # segment head or successors of its tail
+    NEIGHBOR_COUNT = 8
+
+    # Share of the time allowance the greedy start may use
+    GREEDY_TIME_FRACTION = 0.1
+
+    # Chance that the median uphill move is accepted at the start temperature
+    START_ACCEPTANCE = 0.1
+
+    # Frozen batches (nothing accepted) before reheating, 0 disables
+    REHEAT_AFTER = 20
+
+    def __init__(self, tspSolver, maxTime, schedule='geometric', reheatAfter=REHEAT_AFTER,
+                 reheatFactor=0.5):
+        super().__init__(tspSolver, maxTime)
+        self.schedule = createSchedule(schedule)
+        self.reheatAfter = reheatAfter
+        self.reheatFactor = reheatFactor
+        self.random = numpy.random.default_rng()
+        self.accepted = 0
+        self.reheats = 0
+        self._results['schedule'] = schedule
+
+    # Anneals the greedy tour with segment insertion moves: up to
+    # MAX_SEGMENT cities are cut out after `before` and reinserted, same
+    # direction, between c and d = succ(c), so a move only changes the
+    # edges before -> first, last -> after and c -> d and is scored from
+    # those six costs. Moves are drawn and scored in numpy batches against
+    # a snapshot of the linked tour; accepted ones are re-scored against
+    # the live tour before being applied, since earlier moves in the batch
+    # may have changed it. Whenever the tour is about to leave a new best,
+    # it becomes the BSSF.
+    # Time complexity: O(B) per batch plus O(L) per applied move
+    # Space complexity: O(N * K + B)
+    def run(self):
+        greedySolver = GreedySolver(self.getTSPSolver(), self.getMaxTime() * self.GREEDY_TIME_FRACTION)
+        greedySolver.solve()
+        self.setBSSF(greedySolver.getBSSF())
+        self.incrementSolutionCount(greedySolver.getResults()['count'])
+        if self.getBSSF() is None or self.getBSSFCost() == math.inf or self.getCityCount() < 5:
+            return
+
+        self.costs = self.getCostMatrix()
+        self.cost = self.costs.item
+        self.maxSegment = min(self.MAX_SEGMENT, self.getCityCount() - 3)
+        count = min(self.NEIGHBOR_COUNT, self.getCityCount() - 1)
+        self.inNeighbors = numpy.argpartition(self.costs.T, count - 1, axis=1)[:, :count]
+        self.outNeighbors = numpy.argpartition(self.costs, count - 1, axis=1)[:, :count]
+        self.tour = LinkedTour(self.getBSSF().getIndices().tolist())
+
+        currentCost = bestCost = self.getBSSFCost()
+        atBest = False
+        initialTemperature = startTemperature = self.initialTemperature()
+        cycleStart = self.getTotalTime()
+        frozenBatches = 0
+        while not self.exceededMaxTime():
+            progress = (self.getTotalTime() - cycleStart) / max(self.getMaxTime() - cycleStart, 1e-9)
+            temperature = self.schedule.getTemperature(startTemperature, min(progress, 1.0))
+
+            moves, deltas, draws = self.scoreBatch()
+            with numpy.errstate(over='ignore'):
+                candidates = numpy.flatnonzero((deltas <= 0) | (draws < numpy.exp(-deltas / temperature)))
+            self.incrementTotal(len(deltas))
+
+            applied = 0
+            for move in candidates:
+                first, length, c = (int(value) for value in moves[:, move])
+                delta = self.scoreMove(first, length, c)
+                if delta is None or (delta > 0 and draws[move] >= math.exp(-delta / temperature)):
+                    continue
+
+                if atBest and delta > 0:
+                    self.setBSSFFromIndices(self.tour.toOrder())
+                    self.incrementSolutionCount()
+                    atBest = False
+
+                self.tour.moveSegment(first, self.segmentEnd(first, length), c)
+                currentCost += delta
+                applied += 1
+                if currentCost < bestCost:
+                    bestCost = currentCost
+                    atBest = True
+            self.accepted += applied
+
+            frozenBatches = frozenBatches + 1 if applied == 0 else 0
+            if self.reheatAfter and frozenBatches >= self.reheatAfter:
+                startTemperature = initialTemperature * self.reheatFactor
+                cycleStart = self.getTotalTime()
+                frozenBatches = 0
+                self.reheats += 1
+
+        if atBest:
+            self.setBSSFFromIndices(self.tour.toOrder())
+            self.incrementSolutionCount()
+
+        self._results['accepted'] = self.accepted
+        self._results['reheats'] = self.reheats
+
+    # Draws BATCH_SIZE random moves and scores them against a snapshot of
+    # the tour. Invalid moves get an INF delta.
+    # Returns rows (first, length, c), the deltas and one uniform draw per move
+    # Time complexity: O(B + N) for the snapshot
+    # Space complexity: O(B + N)
+    def scoreBatch(self):
+        succ = numpy.array(self.tour.succ)
+        pred = numpy.array(self.tour.pred)
+        labels = numpy.array(self.tour.labels, dtype=numpy.int64)
+
+        firsts = self.random.integers(self.getCityCount(), size=self.BATCH_SIZE)
+        lengths = self.random.integers(1, self.maxSegment + 1, size=self.BATCH_SIZE)
+        lasts = firsts.copy()
+        for extra in range(1, self.maxSegment):
+            longer = lengths > extra
+            lasts[longer] = succ[lasts[longer]]
+        befores = pred[firsts]
+        afters = succ[lasts]
+
+        # Half the moves put c -> first on a short edge, half last -> d
+        columns = self.random.integers(self.inNeighbors.shape[1], size=self.BATCH_SIZE)
+        cs = numpy.where(numpy.arange(self.BATCH_SIZE) % 2 == 0,
+                         self.inNeighbors[firsts, columns], pred[self.outNeighbors[lasts, columns]])
+        ds = succ[cs]
+
+        # c inside first..last, cyclically by label
+        labelFirst, labelC, labelLast = labels[firsts], labels[cs], labels[lasts]
+        inside = numpy.where(labelFirst <= labelLast,
+                             (labelFirst <= labelC) & (labelC <= labelLast),
+                             (labelC >= labelFirst) | (labelC <= labelLast))
+
+        costs = self.costs
+        deltas = (costs[befores, afters] + costs[cs, firsts] + costs[lasts, ds]
+                  - costs[befores, firsts] - costs[lasts, afters] - costs[cs, ds])
+        deltas[inside | (cs == befores)] = math.inf
+
+        return numpy.stack((firsts, lengths, cs)), deltas, self.random.random(self.BATCH_SIZE)
+
+    # Scores one move against the live tour, None if it is no longer valid
+    # Time complexity: O(L)
+    # Space complexity: O(1)
+    def scoreMove(self, first, length, c):
+        cost = self.cost
+        tour = self.tour
+        last = self.segmentEnd(first, length)
+        before, after = tour.pred[first], tour.succ[last]
+        if c == before or tour.between(first, c, last):
+            return None
+
+        d = tour.succ[c]
+        return (cost(before, after) + cost(c, first) + cost(last, d)
+                - cost(before, first) - cost(last, after) - cost(c, d))
+
+    def segmentEnd(self, first, length):
+        last = first
+        for _ in range(length - 1):
+            last = self.tour.succ[last]
+        return last
+
+    # Starts where the median uphill move is accepted with START_ACCEPTANCE
+    # Time complexity: O(B + N)
+    # Space complexity: O(B + N)
+    def initialTemperature(self):
+        _, deltas, _ = self.scoreBatch()
+        uphill = deltas[(deltas > 0) & (deltas < math.inf)]
+        if len(uphill) == 0:
+            return 1.0
+        return float(numpy.median(uphill)) / -math.log(self.START_ACCEPTANCE)
@@ -0,0 +1,146 @@
+import cProfile
+import io
+import math
+import pstats
+import time
+import tracemalloc
+
+
+# Stand-in used when instrumentation is off: every hook is an empty call,
+# so the solver loops pay a few no-op method calls per node
+class NullInstrumentation:
+    enabled = False
+
+    def begin(self):
+        pass
+
+    def end(self) -> bool:
+        return False
+
+    def clock(self) -> float:
+        return 0.0
+
+    def addPhaseTime(self, phase, start):
+        pass
+
+    def recordNodes(self, total):
+        pass
+
+    def recordBSSF(self, solution):
+        pass
+
+    def getResults(self):
+        return None
+
+
+# Collects per-phase wall time, a nodes/second series and the time of
+# every BSSF improvement for one solver run, optionally under cProfile or
+# tracemalloc. One instance is shared by a solver and any solvers it
+# starts internally (e.g. the greedy initial BSSF); only the outermost
+# begin()/end() pair resets the data and starts/stops the capture.
+class SolverInstrumentation:
+    enabled = True
+
+    CAPTURES = ('cprofile', 'tracemalloc')
+
+    # Seconds between samples of the node rate series
+    RATE_INTERVAL = 0.1
+
+    # Rows of cProfile output / tracemalloc allocation sites kept
+    PROFILE_LINES = 25
+
+    def __init__(self, capture=None):
+        super().__init__()
+        if capture is not None and capture not in self.CAPTURES:
+            raise ValueError('Unknown instrumentation capture: {}'.format(capture))
+
+        self.capture = capture
+        self.depth = 0
+        self.reset()
+
+    def reset(self):
+        self.startTime = time.perf_counter()
+        self.phaseTimes = {}
+        self.phaseCounts = {}
+        self.rateSeries = []
+        self.lastSampleTime = self.startTime
+        self.lastSampleNodes = 0
+        self.bssfImprovements = []
+        self.bestCost = math.inf
+        self.profiler = None
+        self.profile = None
+        self.memory = None
+        self.startedTracing = False
+
+    # Worker processes don't inherit instrumentation (profilers can't be
+    # pickled); they run with the null object instead
+    def __reduce__(self):
+        return NullInstrumentation, ()
+
+    def begin(self):
+        self.depth += 1
+        if self.depth > 1:
+            return
+
+        self.reset()
+        if self.capture == 'cprofile':
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        elif self.capture == 'tracemalloc' and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.startedTracing = True
+
+    # Returns True when the outermost run ended and results are complete
+    def end(self) -> bool:
+        self.depth -= 1
+        if self.depth > 0:
+            return False
+
+        if self.profiler is not None:
+            self.profiler.disable()
+            stream = io.StringIO()
+            pstats.Stats(self.profiler, stream=stream).sort_stats('cumulative').print_stats(self.PROFILE_LINES)
+            self.profile = stream.getvalue()
+            self.profiler = None
+        elif self.capture == 'tracemalloc' and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            topSites = tracemalloc.take_snapshot().statistics('lineno')[:self.PROFILE_LINES]
+            self.memory = {'current': current, 'peak': peak, 'top': [str(site) for site in topSites]}
+            if self.startedTracing:
+                tracemalloc.stop()
+        return True
+
+    def clock(self) -> float:
+        return time.perf_counter()
+
+    # Adds the time since start (a clock() reading) to phase
+    def addPhaseTime(self, phase, start):
+        self.phaseTimes[phase] = self.phaseTimes.get(phase, 0.0) + time.perf_counter() - start
+        self.phaseCounts[phase] = self.phaseCounts.get(phase, 0) + 1
+
+    # Samples (elapsed, total nodes, nodes/second since the last sample)
+    # at most every RATE_INTERVAL seconds
+    def recordNodes(self, total):
+        now = time.perf_counter()
+        if now - self.lastSampleTime < self.RATE_INTERVAL:
+            return
+
+        rate = (total - self.lastSampleNodes) / (now - self.lastSampleTime)
+        self.rateSeries.append((now - self.startTime, total, rate))
+        self.lastSampleTime = now
+        self.lastSampleNodes = total
+
+    def recordBSSF(self, solution):
+        if solution is None or solution.cost >= self.bestCost:
+            return
+
+        self.bestCost = solution.cost
+        self.bssfImprovements.append((time.perf_counter() - self.startTime, solution.cost))
+
+    def getResults(self):
+        return {'phases': {phase: {'time': self.phaseTimes[phase], 'count': self.phaseCounts[phase]}
+                           for phase in self.phaseTimes},
+                'nodeRate': self.rateSeries,
+                'bssfImprovements': self.bssfImprovements,
+                'profile': self.profile,
+                'memory': self.memory}
@@ -10,33 +10,75 @@ import time
 
 class TSPSolution:
 	def __init__( self, listOfCities):
-		self.route = listOfCities
+		self._scenario = listOfCities[0]._scenario
+		self._indices = np.array( [city._index for city in listOfCities], dtype=np.int32 )
+		self._route = list(listOfCities)
 		self.cost = self._costOfRoute()
 		#print( [c._index for c in listOfCities] )
 
+	''' <summary>
+		Builds a solution straight from an array of city indices.  City
+		objects are only materialized if route is read.
+		</summary> '''
+	@classmethod
+	def fromIndices( cls, scenario, indices ):
+		solution = cls.__new__( cls )
+		solution._scenario = scenario
+		solution._indices = np.array( indices, dtype=np.int32 )
+		solution._route = None
+		solution.cost = solution._costOfRoute()
+		return solution
+
+	@property
+	def route( self ):
+		if self._route is None:
+			cities = self._getScenario().getCities()
+			self._route = [cities[index] for index in self._indices]
+		return self._route
+
+	def getIndices( self ):
+		return self._indices
+
+	''' <summary>
+		Pickles only the index array and the cost.  The scenario (cost
+		matrices and City list) is left out, so an unpickled solution must
+		be given its scenario again with bindScenario before route or
+		enumerateEdges is used.
+		</summary> '''
+	def __getstate__( self ):
+		return {'_indices': self._indices, 'cost': self.cost}
+
+	def __setstate__( self, state ):
+		self.__dict__.update( state )
+		self._scenario = None
+		self._route = None
+
+	def bindScenario( self, scenario ):
+		self._scenario = scenario
+		self._route = None
+		return self
+
+	def _getScenario( self ):
+		if self._scenario is None:
+			raise ValueError( 'TSPSolution has no scenario; call bindScenario after unpickling' )
+		return self._scenario
+
+	def _edgeCosts( self ):
+		costs = self._getScenario().getCostMatrix()
+		return costs[self._indices, np.roll(self._indices, -1)]
+
+	# Sums the tour edges with one gather over the scenario cost matrix
 	def _costOfRoute( self ):
-		cost = 0
-		last = self.route[0]
-		for city in self.route[1:]:
-			cost += last.costTo(city)
-			last = city
-		cost += self.route[-1].costTo( self.route[0] )
-		return cost
+		cost = self._edgeCosts().sum()
+		return int(cost) if cost < np.inf else np.inf
 
 	def enumerateEdges( self ):
-		elist = []
-		c1 = self.route[0]
-		for c2 in self.route[1:]:
-			dist = c1.costTo( c2 )
-			if dist == np.inf:
-				return None
-			elist.append( (c1, c2, int(math.ceil(dist))) )
-			c1 = c2
-		dist = self.route[-1].costTo( self.route[0] )
-		if dist == np.inf:
+		dists = self._edgeCosts()
+		if np.isinf(dists).any():
 			return None
-		elist.append( (self.route[-1], self.route[0], int(math.ceil(dist))) )
-		return elist
+		route = self.route
+		nextCities = route[1:] + route[:1]
+		return [(c1, c2, int(dist)) for c1, c2, dist in zip(route, nextCities, dists)]
 
 
 def nameForInt( num ):
@@ -59,31 +101,43 @@ class Scenario:
 	HARD_MODE_FRACTION_TO_REMOVE = 0.20 # Remove 20% of the edges
 
 	def __init__( self, city_locations, difficulty, rand_seed ):
+		xs = np.array( [pt.x() for pt in city_locations], dtype=float )
+		ys = np.array( [pt.y() for pt in city_locations], dtype=float )
+		self._initialize( xs, ys, difficulty, rand_seed, None )
+
+	''' <summary>
+		Builds a scenario straight from coordinate arrays, without QPointF.
+		Elevations are drawn the same way as the QPointF constructor unless
+		given explicitly.
+		</summary> '''
+	@classmethod
+	def fromArrays( cls, xs, ys, difficulty, rand_seed, elevations=None ):
+		scenario = cls.__new__( cls )
+		scenario._initialize( xs, ys, difficulty, rand_seed, elevations )
+		return scenario
+
+	def _initialize( self, xs, ys, difficulty, rand_seed, elevations ):
 		self._difficulty = difficulty
+		ncities = len(xs)
 
-		if difficulty == "Normal" or difficulty == "Hard":
-			self._cities = [City( pt.x(), pt.y(), \
-								  random.uniform(0.0,1.0) \
-								) for pt in city_locations]
-		elif difficulty == "Hard (Deterministic)":
+		if difficulty == "Hard (Deterministic)":
 			random.seed( rand_seed )
-			self._cities = [City( pt.x(), pt.y(), \
-								  random.uniform(0.0,1.0) \
-								) for pt in city_locations]
-		else:
-			self._cities = [City( pt.x(), pt.y() ) for pt in city_locations]
-
 
-		num = 0
-		for city in self._cities:
-			#if difficulty == "Hard":
-			city.setScenario(self)
-			city.setIndexAndName( num, nameForInt( num+1 ) )
-			num += 1
+		# City data is stored as parallel arrays; City objects are views
+		self._xs = np.array( xs, dtype=float )
+		self._ys = np.array( ys, dtype=float )
+		if elevations is not None:
+			self._elevations = np.array( elevations, dtype=float )
+		elif difficulty in ("Normal", "Hard", "Hard (Deterministic)"):
+			self._elevations = np.array( [random.uniform(0.0,1.0) for _ in range(ncities)] )
+		else:
+			self._elevations = np.zeros( ncities )
+		self._cities = None
 
-		# Assume all edges exists except self-edges
-		ncities = len(self._cities)
-		self._edge_exists = ( np.ones((ncities,ncities)) - np.diag( np.ones((ncities)) ) ) > 0
+		# Assume all edges exists except self-edges; the edge matrix is only
+		# allocated once edges are actually removed
+		self._edge_exists = None
+		self._cost_matrix = None
 
 		if difficulty == "Hard":
 			self.thinEdges()
@@ -91,8 +145,52 @@ class Scenario:
 			self.thinEdges(deterministic=True)
 
 	def getCities( self ):
+		if self._cities is None:
+			self._cities = [City( self, index ) for index in range( len(self._xs) )]
 		return self._cities
 
+	def getCityCount( self ):
+		return len(self._xs)
+
+	def getCoordinates( self ):
+		return self._xs, self._ys
+
+	def getElevations( self ):
+		return self._elevations
+
+	def _hasEdge( self, src, dst ):
+		if self._edge_exists is None:
+			return src != dst
+		return self._edge_exists[src,dst]
+
+	''' <summary>
+		Full NxN matrix of City.costTo values, built once with numpy broadcasting
+		and cached.  Entries are integral floats; missing edges (and self-edges)
+		are np.inf.  The returned array is read-only, copy it before modifying.
+		</summary> '''
+	def getCostMatrix( self ):
+		if self._cost_matrix is None:
+			self._cost_matrix = self._computeCostMatrix()
+		return self._cost_matrix
+
+	def _computeCostMatrix( self ):
+		xs, ys, elevations = self._xs, self._ys, self._elevations
+
+		# Same operation order as City.costTo so every entry matches it exactly
+		cost = np.sqrt( (xs[np.newaxis,:] - xs[:,np.newaxis])**2 +
+						(ys[np.newaxis,:] - ys[:,np.newaxis])**2 )
+		if not self._difficulty == 'Easy':
+			cost += elevations[np.newaxis,:] - elevations[:,np.newaxis]
+			np.maximum( cost, 0.0, out=cost )
+
+		cost = np.ceil( cost * City.MAP_SCALE )
+		if self._edge_exists is None:
+			np.fill_diagonal( cost, np.inf )
+		else:
+			cost[~self._edge_exists] = np.inf
+		cost.setflags( write=False )
+		return cost
+
 
 	def randperm( self, n ):				#isn't there a numpy function that does this and even gets called in Solver?
 		perm = np.arange(n)
@@ -104,49 +202,60 @@ class Scenario:
 		return perm
 
 	def thinEdges( self, deterministic=False ):
-		ncities = len(self._cities)
+		ncities = self.getCityCount()
+		if self._edge_exists is None:
+			self._edge_exists = ~np.eye( ncities, dtype=bool )
 		edge_count = ncities*(ncities-1) # can't have self-edge
-		num_to_remove = np.floor(self.HARD_MODE_FRACTION_TO_REMOVE*edge_count)
+		num_to_remove = int(np.floor(self.HARD_MODE_FRACTION_TO_REMOVE*edge_count))
+
+		# Deterministic scenarios draw from a numpy generator seeded off the
+		# python random state (seeded with rand_seed in __init__), so they stay
+		# reproducible without a python-level loop
+		rng = np.random.default_rng( random.getrandbits(64) ) if deterministic else np.random
 
 		can_delete	= self._edge_exists.copy()
 
 		# Set aside a route to ensure at least one tour exists
-		route_keep = np.random.permutation( ncities )
-		if deterministic:
-			route_keep = self.randperm( ncities )
-		for i in range(ncities):
-			can_delete[route_keep[i],route_keep[(i+1)%ncities]] = False
+		route_keep = rng.permutation( ncities )
+		can_delete[route_keep, np.roll(route_keep, -1)] = False
+
+		# Remove a uniformly random subset of the deletable edges in one pass:
+		# the num_to_remove smallest of one random key per candidate edge
+		candidates = np.flatnonzero( can_delete )
+		num_to_remove = min( num_to_remove, len(candidates) )
+		if num_to_remove > 0:
+			keys = rng.random( len(candidates) )
+			removed = candidates[ np.argpartition( keys, num_to_remove-1 )[:num_to_remove] ]
+			self._edge_exists.flat[removed] = False
 
-		# Now remove edges until 
-		while num_to_remove > 0:
-			if deterministic:
-				src = random.randint(0,ncities-1)
-				dst = random.randint(0,ncities-1)
-			else:
-				src = np.random.randint(ncities)
-				dst = np.random.randint(ncities)
-			if self._edge_exists[src,dst] and can_delete[src,dst]:
-				self._edge_exists[src,dst] = False
-				num_to_remove -= 1
+		self._cost_matrix = None	# edges changed, drop any cached costs
 
 
 
 
 class City:
-	def __init__( self, x, y, elevation=0.0 ):
-		self._x = x
-		self._y = y
-		self._elevation = elevation
-		self._scenario	= None
-		self._index = -1
-		self._name	= None
-
-	def setIndexAndName( self, index, name ):
-		self._index = index
-		self._name = name
+	# A lightweight view of one entry in its scenario's city arrays
+	__slots__ = ( '_scenario', '_index' )
 
-	def setScenario( self, scenario ):
+	def __init__( self, scenario, index ):
 		self._scenario = scenario
+		self._index = index
+
+	@property
+	def _x( self ):
+		return float( self._scenario._xs[self._index] )
+
+	@property
+	def _y( self ):
+		return float( self._scenario._ys[self._index] )
+
+	@property
+	def _elevation( self ):
+		return float( self._scenario._elevations[self._index] )
+
+	@property
+	def _name( self ):
+		return nameForInt( self._index+1 )
 
 	''' <summary>
 		How much does it cost to get from this city to the destination?
@@ -161,7 +270,7 @@ class City:
 
 		# In hard mode, remove edges; this slows down the calculation...
 		# Use this in all difficulties, it ensures INF for self-edge
-		if not self._scenario._edge_exists[self._index, other_city._index]:
+		if not self._scenario._hasEdge( self._index, other_city._index ):
 			return np.inf
 
 		# Euclidean Distance
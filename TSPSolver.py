@@ -1,33 +1,102 @@
 #!/usr/bin/python3
 
-from which_pyqt import PYQT_VER
-if PYQT_VER == 'PYQT5':
-	from PyQt5.QtCore import QLineF, QPointF
-elif PYQT_VER == 'PYQT4':
-	from PyQt4.QtCore import QLineF, QPointF
-else:
-	raise Exception('Unsupported Version of PyQt: {}'.format(PYQT_VER))
-
-
-
-
 import time
 import numpy as np
 from TSPClasses import *
 import heapq
 import itertools
+import threading
 from GreedySolver import GreedySolver
 from BranchAndBoundSolver import BranchAndBoundSolver
+from DepthFirstBranchAndBoundSolver import DepthFirstBranchAndBoundSolver
+from ParallelBranchAndBoundSolver import ParallelBranchAndBoundSolver
+from HeldKarpSolver import HeldKarpSolver
+from RandomTourSampler import sampleRandomTour
+from LocalSearchSolver import LocalSearchSolver
+from SimulatedAnnealingSolver import SimulatedAnnealingSolver
+from GeneticSolver import GeneticSolver
+from AntColonySolver import AntColonySolver
+from SolverInstrumentation import NullInstrumentation, SolverInstrumentation
+from SearchStrategy import createStrategy
+from LowerBounds import createLowerBound
 
 
 
 class TSPSolver:
 	def __init__( self, gui_view ):
 		self._scenario = None
+		self._instrumentation = NullInstrumentation()
+		self._bssfListeners = []
+		self._cancelListeners = []
+		self._cancelled = threading.Event()
+
+	# Listeners and the cancel flag belong to this process; copies sent to
+	# worker processes start with none and a fresh flag
+	def __getstate__( self ):
+		state = self.__dict__.copy()
+		state['_bssfListeners'] = []
+		state['_cancelListeners'] = []
+		del state['_cancelled']
+		return state
+
+	def __setstate__( self, state ):
+		self.__dict__.update( state )
+		self._cancelled = threading.Event()
 
 	def setupWithScenario( self, scenario ):
 		self._scenario = scenario
 
+	''' <summary>
+		listener( solution ) is called with every improved BSSF a solver
+		finds, on the thread the solver runs on.
+		</summary> '''
+	def addBSSFListener( self, listener ):
+		self._bssfListeners.append( listener )
+
+	def removeBSSFListener( self, listener ):
+		self._bssfListeners.remove( listener )
+
+	def publishBSSF( self, solution ):
+		for listener in self._bssfListeners:
+			listener( solution )
+
+	''' <summary>
+		Asks the running solver to stop; it returns its best tour so far as
+		if the time limit had passed.  Safe to call from another thread.
+		The flag stays set until clearCancel.
+		</summary> '''
+	def cancel( self ):
+		self._cancelled.set()
+		for listener in list(self._cancelListeners):
+			listener()
+
+	def isCancelled( self ):
+		return self._cancelled.is_set()
+
+	def clearCancel( self ):
+		self._cancelled.clear()
+
+	# Called on cancel(), for solvers that must pass the stop on (e.g. to
+	# worker processes)
+	def addCancelListener( self, listener ):
+		self._cancelListeners.append( listener )
+
+	def removeCancelListener( self, listener ):
+		self._cancelListeners.remove( listener )
+
+	''' <summary>
+		Turns on instrumentation for the following solver runs until
+		disableInstrumentation is called.  Results then carry an
+		'instrumentation' entry with phase timers, a nodes/second series and
+		BSSF improvement times.  capture may be 'cprofile' or 'tracemalloc'
+		to also profile the run.
+		</summary> '''
+	def enableInstrumentation( self, capture=None ):
+		self._instrumentation = SolverInstrumentation( capture )
+
+	def disableInstrumentation( self ):
+		self._instrumentation = NullInstrumentation()
+
 
 	''' <summary>
 		This is the entry point for the default solver
@@ -42,26 +111,14 @@ class TSPSolver:
 	
 	def defaultRandomTour( self, time_allowance=60.0 ):
 		results = {}
-		cities = self._scenario.getCities()
-		ncities = len(cities)
-		foundTour = False
-		count = 0
-		bssf = None
 		start_time = time.time()
-		while not foundTour and time.time()-start_time < time_allowance:
-			# create a random permutation
-			perm = np.random.permutation( ncities )
-			route = []
-			# Now build the route using the random permutation
-			for i in range( ncities ):
-				route.append( cities[ perm[i] ] )
-			bssf = TSPSolution(route)
-			count += 1
-			if bssf.cost < np.inf:
-				# Found a valid route
-				foundTour = True
+		# Permutations are drawn and scored in batches; only the winner
+		# becomes a TSPSolution.  Sampling stops early on cancel()
+		tour, _, count = sampleRandomTour( self._scenario.getCostMatrix(), time_allowance,
+										   stop=self.isCancelled )
+		bssf = TSPSolution.fromIndices( self._scenario, tour )
 		end_time = time.time()
-		results['cost'] = bssf.cost if foundTour else math.inf
+		results['cost'] = bssf.cost
 		results['time'] = end_time - start_time
 		results['count'] = count
 		results['soln'] = bssf
@@ -84,9 +141,9 @@ class TSPSolver:
 	'''
 
 	# Additional comments within GreedySolver.py
-    	# Time complexity: O(N^3)
-    	# Space complexity: O(N)
-    	def greedy(self, time_allowance=60.0):
+	# Time complexity: O(N^3)
+	# Space complexity: O(N)
+	def greedy(self, time_allowance=60.0):
 		solver = GreedySolver(self, time_allowance)
 		solver.solve()
 		return solver.getResults()
@@ -103,13 +160,67 @@ class TSPSolver:
 	'''
 		
 	# More detailed comments within BranchAndBoundSolver.py
-    	# Time complexity: O(N! * N^2)
-    	# Space complexity: q = size of queue; O(q * N^2)
-    	def branchAndBound(self, time_allowance=60.0):
-        	maxNodes = 100000
-        	solver = BranchAndBoundSolver(self, maxNodes, time_allowance)
-        	solver.solve()
-        	return solver.getResults()
+	# strategy is one of SearchStrategy.STRATEGIES: 'costPerDepth' (default),
+	# 'bestBound', 'depthFirst' or 'hybrid'; it is reported in results['strategy']
+	# bound is one of LowerBounds.BOUNDS: 'reduced' (default), 'assignment' or
+	# 'arborescence'; per-bound call counts and time are in results['boundStats']
+	# Scenarios with at most heldKarpThreshold cities are solved by heldKarp
+	# instead (0 disables the hand-off), with 'heldKarp' reported as strategy
+	# and bound.  Only default strategy/bound runs are handed off;
+	# checkpointed and resumed searches always use branch and bound
+	# checkpointPath saves the search state (.npz) every checkpointInterval
+	# seconds and when the run ends; resumeFrom continues a saved search with
+	# a fresh time_allowance, using the strategy and bound it was started with
+	# Time complexity: O(N! * N^2)
+	# Space complexity: q = size of queue; O(q * N + N^2)
+	def branchAndBound(self, time_allowance=60.0, strategy='costPerDepth', bound='reduced',
+					   heldKarpThreshold=HeldKarpSolver.HANDOFF_CITIES, checkpointPath=None,
+					   checkpointInterval=BranchAndBoundSolver.CHECKPOINT_INTERVAL, resumeFrom=None):
+		# Unknown names raise ValueError even when the search is handed off
+		createStrategy( strategy )
+		createLowerBound( bound )
+		if (strategy == 'costPerDepth' and bound == 'reduced' and checkpointPath is None
+				and resumeFrom is None and len(self._scenario.getCities()) <= heldKarpThreshold):
+			results = self.heldKarp(time_allowance)
+			results['strategy'] = 'heldKarp'
+			results['bound'] = 'heldKarp'
+			return results
+
+		maxNodes = 100000
+		solver = BranchAndBoundSolver(self, maxNodes, time_allowance, strategy, bound=bound,
+									  checkpointPath=checkpointPath, checkpointInterval=checkpointInterval,
+									  resumeFrom=resumeFrom)
+		solver.solve()
+		return solver.getResults()
+
+	# Exact bitmask dynamic program for small scenarios (up to
+	# HeldKarpSolver.MAX_CITIES); more detailed comments within HeldKarpSolver.py
+	# Time complexity: O(2^N * N^2)
+	# Space complexity: O(2^N * N)
+	def heldKarp(self, time_allowance=60.0):
+		solver = HeldKarpSolver(self, time_allowance)
+		solver.solve()
+		return solver.getResults()
+
+	# Branch and bound that keeps one matrix and undoes its changes on
+	# backtrack instead of queueing nodes; see DepthFirstBranchAndBoundSolver.py
+	# Time complexity: O(N! * N^2)
+	# Space complexity: O(N^2) regardless of run time
+	def depthFirstBranchAndBound(self, time_allowance=60.0):
+		solver = DepthFirstBranchAndBoundSolver(self, time_allowance)
+		solver.solve()
+		return solver.getResults()
+
+	# Branch and bound split across a process pool with a shared incumbent;
+	# see ParallelBranchAndBoundSolver.py.  workers defaults to the CPU count.
+	# Time complexity: O(N! * N^2 / workers)
+	# Space complexity: O(workers * (q * N + N^2))
+	def parallelBranchAndBound(self, time_allowance=60.0, workers=None, strategy='costPerDepth',
+							   bound='reduced'):
+		maxNodes = 100000
+		solver = ParallelBranchAndBoundSolver(self, maxNodes, time_allowance, workers, strategy, bound)
+		solver.solve()
+		return solver.getResults()
 
 
 
@@ -122,8 +233,47 @@ class TSPSolver:
 		algorithm</returns> 
 	'''
 		
+	# Greedy tour improved by 2-opt / Or-opt local search; more detailed
+	# comments within LocalSearchSolver.py
+	# Time complexity: O(N^3) greedy, then O(N * K) per local search pass
+	# Space complexity: O(N * K)
 	def fancy( self,time_allowance=60.0 ):
-		pass
+		solver = LocalSearchSolver(self, time_allowance)
+		solver.solve()
+		return solver.getResults()
+
+	# Simulated annealing from the greedy tour with segment insertion moves;
+	# more detailed comments within SimulatedAnnealingSolver.py
+	# schedule is one of CoolingSchedule.SCHEDULES: 'geometric' (default),
+	# 'linear' or 'logarithmic'.  After reheatAfter batches with no accepted
+	# move the schedule restarts at reheatFactor times the initial
+	# temperature (0 disables reheating)
+	# Time complexity: O(N^3) greedy, then O(1) amortized per move
+	# Space complexity: O(N * K)
+	def simulatedAnnealing( self, time_allowance=60.0, schedule='geometric',
+							reheatAfter=SimulatedAnnealingSolver.REHEAT_AFTER, reheatFactor=0.5 ):
+		solver = SimulatedAnnealingSolver(self, time_allowance, schedule, reheatAfter, reheatFactor)
+		solver.solve()
+		return solver.getResults()
+
+	# Genetic algorithm over a (populationSize, N) array of tours seeded from
+	# greedy and random tours; more detailed comments within GeneticSolver.py
+	# Time complexity: O(N^3) greedy, then O(populationSize * N) per generation
+	# Space complexity: O(populationSize * N + N^2)
+	def genetic( self, time_allowance=60.0, populationSize=GeneticSolver.POPULATION_SIZE ):
+		solver = GeneticSolver(self, time_allowance, populationSize)
+		solver.solve()
+		return solver.getResults()
+
+	# Ant colony optimization with N x N pheromone and visibility arrays;
+	# more detailed comments within AntColonySolver.py.  count is the number
+	# of iterations and total the number of ant tours built
+	# Time complexity: O(antCount * N^2) per iteration
+	# Space complexity: O(N^2 + antCount * N)
+	def antColony( self, time_allowance=60.0, antCount=AntColonySolver.ANT_COUNT ):
+		solver = AntColonySolver(self, time_allowance, antCount)
+		solver.solve()
+		return solver.getResults()
 		
 
 
@@ -0,0 +1,44 @@
+# Remembers the cheapest path cost seen for each (visited set, current city)
+# state. Two partial tours in the same state have the same completions, so
+# the more expensive one can never lead to a better tour. Entries are
+# evicted oldest first once maxEntries is reached.
+class TranspositionTable:
+    def __init__(self, maxEntries):
+        super().__init__()
+
+        self.entries = {}
+        self.maxEntries = maxEntries
+        self.lookups = 0
+        self.dominated = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    # Returns True when the node is dominated; otherwise records it
+    # Time complexity: O(1) amortized (O(N / 64) to hash the bitset)
+    # Space complexity: O(1) per recorded state
+    def isDominated(self, branchNode) -> bool:
+        self.lookups += 1
+        key = (branchNode.get_visited(), branchNode.get_city_index())
+        pathCost = branchNode.get_path_cost()
+
+        bestCost = self.entries.get(key)
+        if bestCost is not None and bestCost <= pathCost:
+            self.dominated += 1
+            return True
+
+        if bestCost is None and len(self.entries) >= self.maxEntries:
+            del self.entries[next(iter(self.entries))]
+            self.evicted += 1
+        self.entries[key] = pathCost
+        return False
+
+    def getStats(self):
+        return {
+            'maxEntries': self.maxEntries,
+            'size': len(self.entries),
+            'lookups': self.lookups,
+            'dominated': self.dominated,
+            'evicted': self.evicted,
+        }